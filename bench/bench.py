@@ -0,0 +1,407 @@
+#!/usr/bin/python3
+
+# =============================================================================================
+# Súbor: bench.py
+# Jazyk: Python 3.8
+# Opis: Sada výkonnostných testov skriptu interpret.py. Pre každú úlohu sa vygeneruje program
+#       v IPPcode20, zmeria sa čas načítania, čas vykonávania, počet vykonaných inštrukcií za
+#       sekundu a maximálna veľkosť pamäte procesu. Výsledky sa vypíšu vo formáte JSON, ktorý sa
+#       dá uložiť ako základ a porovnať s ďalším meraním (parameter --compare).
+# =============================================================================================
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+INTERPRET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interpret", "interpret.py")
+
+# Operačné kódy, ktorých prvý operand je návestie
+LABEL_OPCODES = ("LABEL", "JUMP", "CALL", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+
+# Predvolená relatívna zmena, od ktorej sa výsledok pri porovnaní považuje za zhoršenie, a najmenší
+# absolútny rozdiel času v sekundách, ktorý sa ešte nepovažuje za šum merania
+THRESHOLD = 0.10
+NOISE = 0.02
+
+
+def assemble(code):
+    """
+    Preklad programu v IPPcode20 (jedna inštrukcia na riadok, operandy oddelené medzerou) na XML.
+    Inštrukcie majú order od 2, aby sa pred program dala vložiť inštrukcia EXIT s order 1.
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode20">']
+    order = 1
+    for line in code.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        order += 1
+        opcode = parts[0]
+        lines.append('<instruction order="%d" opcode="%s">' % (order, opcode))
+        for number, operand in enumerate(parts[1:], 1):
+            if number == 1 and opcode in LABEL_OPCODES:
+                kind, value = "label", operand
+            elif number == 2 and opcode == "READ":
+                kind, value = "type", operand
+            elif operand[:3] in ("GF@", "LF@", "TF@"):
+                kind, value = "var", operand
+            else:
+                kind, value = operand.split("@", 1)
+            lines.append('<arg%d type="%s">%s</arg%d>' % (number, kind, escape(value), number))
+        lines.append('</instruction>')
+    lines.append('</program>')
+    return "\n".join(lines) + "\n"
+
+
+def loadOnly(source):
+    """ Rovnaký program, ktorý sa hneď po načítaní ukončí inštrukciou EXIT s order 1 """
+    return source.replace('<program language="IPPcode20">',
+                          '<program language="IPPcode20">\n'
+                          '<instruction order="1" opcode="EXIT"><arg1 type="int">0</arg1></instruction>', 1)
+
+
+""" ------------------------ ÚLOHY ------------------------ """
+
+
+def loop(size):
+    """ Tesný cyklus s celočíselnou aritmetikou """
+    return """
+DEFVAR GF@i
+DEFVAR GF@sum
+MOVE GF@i int@0
+MOVE GF@sum int@0
+LABEL loop
+ADD GF@sum GF@sum GF@i
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@%d
+WRITE GF@sum
+""" % size, ""
+
+
+def fib(size):
+    """ Rekurzívny výpočet Fibonacciho čísla inštrukciami CALL a RETURN """
+    return """
+DEFVAR GF@n
+DEFVAR GF@r
+DEFVAR GF@t
+MOVE GF@n int@%d
+CALL fib
+WRITE GF@r
+JUMP end
+LABEL fib
+LT GF@t GF@n int@2
+JUMPIFEQ base GF@t bool@true
+SUB GF@n GF@n int@1
+CALL fib
+PUSHS GF@r
+SUB GF@n GF@n int@1
+CALL fib
+POPS GF@t
+ADD GF@r GF@r GF@t
+ADD GF@n GF@n int@2
+RETURN
+LABEL base
+MOVE GF@r GF@n
+RETURN
+LABEL end
+""" % size, ""
+
+
+def ackermann(size):
+    """ Ackermannova funkcia A(2, n) - hlboká rekurzia, funkcia zachováva hodnotu GF@m """
+    return """
+DEFVAR GF@m
+DEFVAR GF@n
+DEFVAR GF@r
+MOVE GF@m int@2
+MOVE GF@n int@%d
+CALL ack
+WRITE GF@r
+JUMP end
+LABEL ack
+JUMPIFNEQ ack_m GF@m int@0
+ADD GF@r GF@n int@1
+RETURN
+LABEL ack_m
+JUMPIFNEQ ack_n GF@n int@0
+SUB GF@m GF@m int@1
+MOVE GF@n int@1
+CALL ack
+ADD GF@m GF@m int@1
+RETURN
+LABEL ack_n
+SUB GF@n GF@n int@1
+CALL ack
+SUB GF@m GF@m int@1
+MOVE GF@n GF@r
+CALL ack
+ADD GF@m GF@m int@1
+RETURN
+LABEL end
+""" % size, ""
+
+
+def strings(size):
+    """ Skladanie reťazca inštrukciou CONCAT a jeho prepisovanie inštrukciou SETCHAR """
+    return """
+DEFVAR GF@s
+DEFVAR GF@i
+DEFVAR GF@length
+MOVE GF@s string@
+MOVE GF@i int@0
+LABEL build
+CONCAT GF@s GF@s string@ab
+ADD GF@i GF@i int@1
+JUMPIFNEQ build GF@i int@%d
+STRLEN GF@length GF@s
+MOVE GF@i int@0
+LABEL set
+SETCHAR GF@s GF@i string@x
+ADD GF@i GF@i int@1
+JUMPIFNEQ set GF@i GF@length
+WRITE GF@length
+""" % size, ""
+
+
+def stack(size):
+    """ Aritmetika a podmienené skoky rozšírenia STACK """
+    return """
+DEFVAR GF@i
+DEFVAR GF@sum
+MOVE GF@i int@0
+MOVE GF@sum int@0
+LABEL loop
+PUSHS GF@sum
+PUSHS GF@i
+PUSHS int@3
+MULS
+ADDS
+POPS GF@sum
+PUSHS GF@i
+PUSHS int@1
+ADDS
+POPS GF@i
+PUSHS GF@i
+PUSHS int@%d
+JUMPIFNEQS loop
+WRITE GF@sum
+""" % size, ""
+
+
+def floats(size):
+    """ Aritmetika s desatinnými číslami rozšírenia FLOAT """
+    return """
+DEFVAR GF@i
+DEFVAR GF@x
+DEFVAR GF@one
+DEFVAR GF@sum
+MOVE GF@i int@1
+INT2FLOAT GF@one int@1
+INT2FLOAT GF@sum int@0
+LABEL loop
+INT2FLOAT GF@x GF@i
+DIV GF@x GF@one GF@x
+MUL GF@x GF@x GF@x
+ADD GF@sum GF@sum GF@x
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@%d
+WRITE GF@sum
+""" % (size + 1), ""
+
+
+def read(size):
+    """ Čítanie celých čísel zo vstupu inštrukciou READ """
+    return """
+DEFVAR GF@x
+DEFVAR GF@sum
+DEFVAR GF@type
+MOVE GF@sum int@0
+LABEL loop
+READ GF@x int
+TYPE GF@type GF@x
+JUMPIFEQ end GF@type string@nil
+ADD GF@sum GF@sum GF@x
+JUMP loop
+LABEL end
+WRITE GF@sum
+""", "".join("%d\n" % number for number in range(size))
+
+
+def write(size):
+    """ Výpis celých čísel a reťazcov inštrukciou WRITE """
+    return """
+DEFVAR GF@i
+MOVE GF@i int@0
+LABEL loop
+WRITE GF@i
+WRITE string@\\010
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@%d
+""" % size, ""
+
+
+def large(size):
+    """ Veľký program bez cyklov - meria hlavne čas načítania a kontroly XML """
+    body = "".join("ADD GF@x GF@x int@%d\nSUB GF@x GF@x int@%d\n" % (index, index) for index in range(size // 2))
+    return "DEFVAR GF@x\nMOVE GF@x int@0\n" + body + "WRITE GF@x\n", ""
+
+
+# Úlohy - názov, funkcia generujúca program a vstup, predvolená veľkosť
+WORKLOADS = (
+    ("loop", loop, 200000),
+    ("fib", fib, 18),
+    ("ackermann", ackermann, 150),
+    ("strings", strings, 10000),
+    ("stack", stack, 50000),
+    ("floats", floats, 100000),
+    ("read", read, 100000),
+    ("write", write, 100000),
+    ("large-20k", large, 20000),
+    ("large-100k", large, 100000),
+)
+
+
+""" ------------------------ MERANIE ------------------------ """
+
+
+def execute(arguments, input_file):
+    """ Jeden beh interpretu - čas v sekundách, maximálna veľkosť pamäte v KiB a návratová hodnota """
+    with open(input_file, "rb") as stdin:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, INTERPRET] + arguments, stdin=stdin,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    # Návratová hodnota ako v module subprocess - záporné číslo signálu, ktorým bol proces ukončený
+    # (os.waitstatus_to_exitcode je až v Pythone 3.9)
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    return elapsed, usage.ru_maxrss, process.returncode
+
+
+def measure(name, generator, size, repeat, options, directory):
+    """ Meranie jednej úlohy - najkratšie časy z repeat behov a počet vykonaných inštrukcií """
+    code, data = generator(size)
+    source = assemble(code)
+    paths = {}
+    for kind, content in (("source", source), ("load", loadOnly(source)), ("input", data)):
+        paths[kind] = os.path.join(directory, "%s.%s" % (name, kind))
+        with open(paths[kind], "w") as stream:
+            stream.write(content)
+
+    # Bez vyrovnávacej pamäte programov, inak by load_s meralo iba načítanie uloženého programu
+    arguments = options + ["--input=" + paths["input"], "--no-cache"]
+    # Prvý beh sa nemeria, aby mali všetky merané behy rovnako zahriatu vyrovnávaciu pamäť súborov
+    execute(arguments + ["--source=" + paths["load"]], paths["input"])
+    execute(arguments + ["--source=" + paths["source"]], paths["input"])
+    load = total = None
+    peak = 0
+    for _ in range(repeat):
+        elapsed, _, _ = execute(arguments + ["--source=" + paths["load"]], paths["input"])
+        load = elapsed if load is None else min(load, elapsed)
+        elapsed, rss, code = execute(arguments + ["--source=" + paths["source"]], paths["input"])
+        total = elapsed if total is None else min(total, elapsed)
+        peak = max(peak, rss)
+
+    # Počet inštrukcií nezávisí od engine, štatistiky sa zbierajú bez parametra --engine
+    stats = os.path.join(directory, "%s.stats" % name)
+    counting = [argument for argument in arguments if not argument.startswith("--engine")]
+    execute(counting + ["--source=" + paths["source"], "--stats=" + stats, "--insts"], paths["input"])
+    with open(stats) as stream:
+        instructions = int(stream.read() or 0)
+
+    execution = max(total - load, 0.0)
+    return {
+        "size": size,
+        "load_s": round(load, 6),
+        "exec_s": round(execution, 6),
+        "total_s": round(total, 6),
+        "instructions": instructions,
+        "ips": round(instructions / execution) if execution else None,
+        "peak_rss_kb": peak,
+        "exit_code": code,
+    }
+
+
+def run(args):
+    """ Spustenie vybraných úloh a zostavenie výsledkov """
+    selected = [workload for workload in WORKLOADS if not args.workloads or workload[0] in args.workloads]
+    unknown = set(args.workloads) - {workload[0] for workload in WORKLOADS}
+    if unknown:
+        sys.exit("Neznáma úloha: " + ", ".join(sorted(unknown)))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, generator, size in selected:
+            results[name] = measure(name, generator, max(int(size * args.scale), 1), args.repeat,
+                                    args.option, directory)
+            print("%-12s %s" % (name, json.dumps(results[name])), file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "options": args.option,
+        "repeat": args.repeat,
+        "scale": args.scale,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """ Porovnanie s uloženým základom - vypíše tabuľku a vráti počet zhoršení """
+    regressions = 0
+    print("%-12s %-12s %12s %12s %8s" % ("úloha", "veličina", "základ", "teraz", "zmena"))
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for key in ("load_s", "exec_s", "peak_rss_kb"):
+            before, after = base[key], result[key]
+            change = (after - before) / before if before else 0.0
+            noise = NOISE if key != "peak_rss_kb" else 0
+            worse = change > threshold and after - before > noise
+            regressions += worse
+            print("%-12s %-12s %12s %12s %+7.1f%%%s"
+                  % (name, key, before, after, 100 * change, "  ZHORŠENIE" if worse else ""))
+        if result["exit_code"] != base["exit_code"]:
+            regressions += 1
+            print("%-12s %-12s %12d %12d %8s  ZHORŠENIE" % (name, "exit_code", base["exit_code"],
+                                                          result["exit_code"], ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Výkonnostné testy skriptu interpret.py")
+    parser.add_argument("workloads", nargs="*", help="názvy úloh (predvolene všetky): "
+                        + ", ".join(workload[0] for workload in WORKLOADS))
+    parser.add_argument("--repeat", type=int, default=3, help="počet behov pre každé meranie")
+    parser.add_argument("--scale", type=float, default=1.0, help="násobok predvolenej veľkosti úloh")
+    parser.add_argument("--option", action="append", default=[],
+                        help="parameter pre interpret.py, napr. --option=--engine=compiled (opakovateľný)")
+    parser.add_argument("--output", help="súbor, do ktorého sa uložia výsledky vo formáte JSON")
+    parser.add_argument("--compare", help="súbor s uloženými výsledkami, s ktorými sa meranie porovná")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="relatívna zmena, od ktorej sa výsledok považuje za zhoršenie")
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as stream:
+            json.dump(results, stream, indent=1)
+    elif args.compare is None:
+        json.dump(results, sys.stdout, indent=1)
+        print()
+
+    if args.compare is not None and compare(baseline, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+# =============================================================================================
+# Súbor: literals.py
+# Jazyk: Python 3.8
+# Opis: Meranie času načítania programu v závislosti od dĺžky reťazcovej konštanty.
+#       Pre každú dĺžku sa vygeneruje program so správnou a s chybnou konštantou
+#       (chybný znak na konci), ktorý sa načíta skriptom interpret.py bez vyrovnávacej pamäte
+#       programov (--no-cache), aby sa meralo skutočné spracovanie XML.
+# =============================================================================================
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+INTERPRET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "interpret", "interpret.py")
+
+# Dĺžky reťazcovej konštanty, pre ktoré sa meria čas načítania
+LENGTHS = (1000, 10000, 100000, 1000000)
+
+
+def literal(length, valid):
+    """ Reťazcová konštanta približne danej dĺžky s escape sekvenciami, chybná konštanta končí znakom # """
+    return "abc\\032" * max(length // 7, 1) + ("x" if valid else "#")
+
+
+def program(text):
+    """ XML program s jedinou inštrukciou WRITE, ktorej operandom je zadaná konštanta """
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<program language="IPPcode20">\n'
+            '<instruction order="1" opcode="WRITE"><arg1 type="string">' + text + '</arg1></instruction>\n'
+            '</program>\n')
+
+
+def measure(text, repeat):
+    """ Najkratší čas z repeat behov interpretu a jeho návratová hodnota """
+    with tempfile.NamedTemporaryFile("w", suffix=".xml", delete=False) as source:
+        source.write(program(text))
+    try:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, INTERPRET, "--source=" + source.name, "--input=" + os.devnull,
+                                     "--no-cache"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result.returncode
+    finally:
+        os.unlink(source.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Čas načítania programu podľa dĺžky reťazcovej konštanty")
+    parser.add_argument("--repeat", type=int, default=3, help="počet behov pre každé meranie")
+    parser.add_argument("lengths", type=int, nargs="*", default=LENGTHS, help="dĺžky konštanty")
+    args = parser.parse_args()
+
+    print("%10s %12s %6s %12s %6s" % ("dĺžka", "správna [s]", "kód", "chybná [s]", "kód"))
+    for length in args.lengths:
+        valid_time, valid_code = measure(literal(length, True), args.repeat)
+        invalid_time, invalid_code = measure(literal(length, False), args.repeat)
+        print("%10d %12.4f %6d %12.4f %6d" % (length, valid_time, valid_code, invalid_time, invalid_code))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,12 +9,23 @@
 # =============================================================================================
 
 import argparse
+import functools
+import hashlib
+import io
+import json
+import marshal
+import mmap
+import os
 import re
+import signal
+import socket
+import stat
 import sys
+import tempfile
+import time
+import zlib
 import xml.etree.ElementTree as ElementTree
 
-label_frame = []
-
 
 # Triedy na vyhadzovanie chybových hlášok a ukončenie programu s určitým návratovým kódom."""
 
@@ -27,6 +38,10 @@ class FileInputException(Exception):
     pass
 
 
+class FileOutputException(Exception):
+    pass
+
+
 class XMLFormatException(Exception):
     pass
 
@@ -63,1504 +78,3167 @@ class StringOperationException(Exception):
     pass
 
 
+class FrameLimitException(Exception):
+    pass
+
+
+class DataStackLimitException(Exception):
+    pass
+
+
+class TimeLimitException(Exception):
+    pass
+
+
+class ExitException(Exception):
+    """ Ukončenie programu inštrukciou EXIT, args[0] je návratová hodnota """
+    pass
+
+
+# Návratová hodnota a chybová hláška pre každú chybu
+ERRORS = {
+    ParameterException: (10, "Zlé parametre!"),
+    FileInputException: (11, None),
+    FileOutputException: (12, "Výstupný súbor sa nedá otvoriť!"),
+    XMLFormatException: (31, "Chybný XML formát vo vstupnom súbore!"),
+    XMLStructureException: (32, "Zlá štruktúra XML!"),
+    SemanticException: (52, "Chybná sémantika!"),
+    OperandTypeException: (53, "Chybný typ operandu!"),
+    UndeclaredVariableException: (54, "Premenná neexistuje!"),
+    UndeclaredFrameException: (55, "Rámec neexistuje!"),
+    MissingValueException: (56, "Chýbajúca hodnota!"),
+    ValueOperandException: (57, "Chybná hodnota operandu!"),
+    StringOperationException: (58, "Chybná práca s reťazcom!"),
+    FrameLimitException: (99, "Prekročená maximálna hĺbka zásobníka rámcov!"),
+    DataStackLimitException: (99, "Prekročená maximálna veľkosť dátového zásobníka!"),
+    TimeLimitException: (99, "Prekročený časový limit!"),
+}
+
+
+# Operačné kódy, index v tejto n-tici je číslo operačného kódu v predspracovanej inštrukcii
+OPCODES = (
+    "MOVE", "CREATEFRAME", "PUSHFRAME", "POPFRAME", "DEFVAR", "CALL", "RETURN",
+    "PUSHS", "POPS", "CLEARS", "ADDS", "SUBS", "MULS", "IDIVS", "LTS", "GTS", "EQS",
+    "ANDS", "ORS", "NOTS", "INT2CHARS", "STRI2INTS", "JUMPIFEQS", "JUMPIFNEQS",
+    "ADD", "SUB", "MUL", "IDIV", "DIV", "LT", "GT", "EQ", "AND", "OR", "NOT",
+    "INT2CHAR", "STRI2INT", "INT2FLOAT", "FLOAT2INT", "READ", "WRITE",
+    "CONCAT", "STRLEN", "GETCHAR", "SETCHAR", "TYPE",
+    "LABEL", "JUMP", "JUMPIFEQ", "JUMPIFNEQ", "EXIT", "DPRINT", "BREAK",
+)
+# Superinštrukcie, ktoré vytvára iba optimalizácia programu (parameter --optimize),
+# ich čísla operačných kódov nasledujú za číslami operačných kódov v OPCODES
+SUPERINSTRUCTIONS = ("STACKADD", "STACKSUB", "STACKMUL", "LTJUMP", "GTJUMP", "EQJUMP")
+OPCODE_NAMES = OPCODES + SUPERINSTRUCTIONS
+OPCODE_ID = {opcode: index for index, opcode in enumerate(OPCODE_NAMES)}
+
+# Druhy operandov jednotlivých operačných kódov (var - premenná, symb - premenná alebo konštanta,
+# label - návestie, type - typ), počet operandov je daný dĺžkou n-tice
+OPCODE_OPERANDS = {
+    "MOVE": ("var", "symb"), "CREATEFRAME": (), "PUSHFRAME": (), "POPFRAME": (),
+    "DEFVAR": ("var",), "CALL": ("label",), "RETURN": (),
+    "PUSHS": ("symb",), "POPS": ("var",), "CLEARS": (), "ADDS": (), "SUBS": (), "MULS": (), "IDIVS": (),
+    "LTS": (), "GTS": (), "EQS": (), "ANDS": (), "ORS": (), "NOTS": (), "INT2CHARS": (), "STRI2INTS": (),
+    "JUMPIFEQS": ("label",), "JUMPIFNEQS": ("label",),
+    "ADD": ("var", "symb", "symb"), "SUB": ("var", "symb", "symb"), "MUL": ("var", "symb", "symb"),
+    "IDIV": ("var", "symb", "symb"), "DIV": ("var", "symb", "symb"),
+    "LT": ("var", "symb", "symb"), "GT": ("var", "symb", "symb"), "EQ": ("var", "symb", "symb"),
+    "AND": ("var", "symb", "symb"), "OR": ("var", "symb", "symb"), "NOT": ("var", "symb"),
+    "INT2CHAR": ("var", "symb"), "STRI2INT": ("var", "symb", "symb"),
+    "INT2FLOAT": ("var", "symb"), "FLOAT2INT": ("var", "symb"),
+    "READ": ("var", "type"), "WRITE": ("symb",),
+    "CONCAT": ("var", "symb", "symb"), "STRLEN": ("var", "symb"),
+    "GETCHAR": ("var", "symb", "symb"), "SETCHAR": ("var", "symb", "symb"), "TYPE": ("var", "symb"),
+    "LABEL": ("label",), "JUMP": ("label",), "JUMPIFEQ": ("label", "symb", "symb"),
+    "JUMPIFNEQ": ("label", "symb", "symb"), "EXIT": ("symb",), "DPRINT": ("symb",), "BREAK": (),
+}
+
+
+class Uninitialized:
+    """
+    Hodnota definovanej premennej, do ktorej ešte nebola priradená žiadna hodnota.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<neinicializovaná>"
+
+
+UNINITIALIZED = Uninitialized()
+
+# Reťazec dlhší ako ROPE_THRESHOLD znakov vytvorený inštrukciou CONCAT sa ukladá ako Rope
+ROPE_THRESHOLD = 1024
+# Počet pripojených častí, ktoré sa v Rope spoja do jedného bloku
+ROPE_BLOCK = 64
+
+
+class RopeBuffer:
+    """
+    Zdieľaný zoznam častí reťazca, do ktorého sa iba pripája na koniec. Spojenie častí
+    nemení obsah, preto všetky Rope nad týmto zoznamom zostávajú platné.
+
+    Parametre
+    ----------
+    pieces : list
+        Časti reťazca v poradí
+    length : int
+        Súčet dĺžok všetkých častí
+    pending : int
+        Počet častí pripojených od posledného spojenia do bloku
+    """
+    __slots__ = ('pieces', 'length', 'pending')
+
+    def __init__(self, text):
+        self.pieces = [text]
+        self.length = len(text)
+        self.pending = 0
+
+
+class Rope:
+    """
+    Reťazec IPPcode20 s odloženým spájaním - prvých length znakov zdieľaného RopeBuffer.
+
+    CONCAT pripojí druhý operand na koniec zoznamu v konštantnom čase, ak Rope končí tam,
+    kde zoznam (inak sa vytvorí nový zoznam). Na jeden reťazec sa časti spoja až vtedy,
+    keď je potrebný obsah - porovnanie, GETCHAR, SETCHAR, STRI2INT, WRITE a DPRINT.
+    Každých ROPE_BLOCK pripojených častí sa spojí do jedného bloku, takže réžia zoznamu
+    je obmedzená na jednu položku na ROPE_BLOCK častí.
+    """
+    __slots__ = ('buffer', 'length')
+
+    def __init__(self, buffer, length):
+        self.buffer = buffer
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+    def append(self, text):
+        """ Nový Rope s pripojeným reťazcom text, pôvodný Rope sa nemení
+        """
+        buffer = self.buffer
+        if buffer.length != self.length:
+            buffer = RopeBuffer(self.flatten())
+        pieces = buffer.pieces
+        pieces.append(text)
+        buffer.length += len(text)
+        buffer.pending += 1
+        if buffer.pending >= ROPE_BLOCK:
+            pieces[-ROPE_BLOCK:] = ["".join(pieces[-ROPE_BLOCK:])]
+            buffer.pending = 0
+        return Rope(buffer, buffer.length)
+
+    def flatten(self):
+        """ Obsah ako str, spojený reťazec nahradí časti zoznamu, takže ďalšie spojenie je okamžité
+        """
+        buffer = self.buffer
+        text = "".join(buffer.pieces)
+        buffer.pieces = [text]
+        buffer.pending = 0
+        return text if len(text) == self.length else text[:self.length]
+
+
+# Názvy typov IPPcode20 podľa typu hodnoty v Pythone - int, bool, float, str, Rope a None (nil)
+TYPE_NAMES = {int: "int", bool: "bool", float: "float", str: "string", Rope: "string", type(None): "nil"}
+
+# Escape sekvencia \ddd v reťazcovej konštante
+ESCAPE_SEQUENCE = re.compile(r'\\([0-9]{3})')
+
+# Znaky, ktorými môže začínať a pokračovať identifikátor (názov premennej alebo návestia)
+IDENTIFIER_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_-$&%*!?")
+IDENTIFIER_CHARS = IDENTIFIER_START | frozenset("0123456789")
+# Znaky, ktoré sa v reťazcovej konštante nesmú vyskytnúť priamo (iba ako escape sekvencia)
+STRING_FORBIDDEN = re.compile(r'[\s#]')
+
+# Predvolená maximálna hĺbka zásobníka rámcov a počet vopred alokovaných rámcov
+FRAME_STACK_LIMIT = 100000
+FRAME_POOL_SIZE = 64
+
+# Predvolená maximálna veľkosť dátového zásobníka
+DATA_STACK_LIMIT = 1 << 20
+
+# Najdlhší povolený časový limit behu programu v sekundách - väčšie hodnoty signal.setitimer nemusí prijať
+TIME_LIMIT_MAX = 100000000
+
+# Veľkosť vyrovnávacej pamäte výstupu (počet znakov), po ktorej naplnení sa výstup vypíše
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# Veľkosť bloku (v bajtoch), po ktorých sa číta vstup, ktorý nie je možné namapovať do pamäte
+INPUT_CHUNK_SIZE = 1 << 16
+
+# Vyrovnávacia pamäť načítaných programov - adresár (ak nie je zadaný premennou prostredia IPP_CACHE_DIR),
+# prípona súborov a maximálna celková veľkosť v bajtoch, po jej prekročení sa mažú najdlhšie nepoužité programy
+CACHE_DIRECTORY = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"),
+                                                                              ".cache"), "ipp-interpret")
+CACHE_SUFFIX = ".ippc"
+CACHE_SIZE_LIMIT = 1 << 26
+
+# Inštrukcie, ktorých cieľové návestie sa vyhľadá už pri načítaní programu
+JUMP_OPCODES = frozenset(OPCODE_ID[opcode] for opcode in ("CALL", "JUMP", "JUMPIFEQ", "JUMPIFNEQ",
+                                                          "JUMPIFEQS", "JUMPIFNEQS"))
+# Inštrukcie, ktoré sa nezapočítavajú do štatistík rozšírenia STATP (--insts, --hot)
+STATISTICS_EXCLUDED = frozenset((OPCODE_ID["LABEL"], OPCODE_ID["DPRINT"], OPCODE_ID["BREAK"]))
+
+# Názov hlavného programu (kódu mimo funkcií volaných inštrukciou CALL) v profile a počet riadkov
+# v tabuľke inštrukcií textovej správy profilu
+PROFILE_MAIN = "<main>"
+PROFILE_REPORT_LIMIT = 50
+
+# Predvolený interval vzorkovania (parameter --sample-interval) v milisekundách procesorového času
+SAMPLE_INTERVAL = 5
+
+# Počet načítaných programov, ktoré si dávkový režim (--serve) pamätá medzi úlohami
+SERVE_PROGRAM_CACHE = 256
+
+# Polia úlohy dávkového režimu (okrem ľubovoľného id) a ich povolené typy, iné polia alebo hodnoty
+# sú chybné parametre, rovnako ako neznáme limity
+SERVE_JOB_FIELDS = {
+    "xml": str, "source": str, "input": str, "input_file": str, "engine": str, "optimize": bool,
+    "stats": list, "limits": dict,
+}
+SERVE_JOB_LIMITS = {"time": (int, float), "frames": int, "data_stack": int}
+
+# Počet interpretovaných vykonaní základného bloku, po ktorých sa blok preloží na funkciu v Pythone
+COMPILE_THRESHOLD = 8
+
+# Inštrukcie bez cieľového návestia, za ktorými sa nepokračuje nasledujúcou inštrukciou
+BLOCK_END_OPCODES = frozenset((OPCODE_ID["RETURN"], OPCODE_ID["EXIT"]))
+
+
+class Argument:
+    """
+    Predspracovaný operand inštrukcie.
+
+    Parametre
+    ----------
+    kind : str
+        Typ operandu (var, int, bool, string, nil, float, label, type)
+    frame : str
+        Rámec premennej (GF, LF, TF), pri konštantách None
+    value : str, int, bool, float alebo None
+        Názov premennej alebo hodnota konštanty prevedená na hodnotu v Pythone
+    """
+    __slots__ = ('kind', 'frame', 'value')
+
+    def __init__(self, kind, frame, value):
+        self.kind = kind
+        self.frame = frame
+        self.value = value
+
+
+class Instruction:
+    """
+    Predspracovaná inštrukcia, s ktorou pracuje vykonávací cyklus namiesto elementu XML.
+
+    Parametre
+    ----------
+    order : int
+        Poradie inštrukcie v zdrojovom XML
+    opcode : int
+        Číslo operačného kódu (index v OPCODES)
+    args : tuple
+        Operandy inštrukcie (Argument)
+    target : int
+        Index cieľového návestia pri skokových inštrukciách, inak None
+    source : tuple
+        Pôvodné inštrukcie, ktoré superinštrukcia nahrádza, pri bežnej inštrukcii None
+    skipped : tuple
+        Inštrukcie JUMP, ktoré optimalizácia preskočí, keď sa skok vykoná
+    """
+    __slots__ = ('order', 'opcode', 'args', 'target', 'source', 'skipped')
+
+    def __init__(self, order, opcode, args, target=None, source=None, skipped=()):
+        self.order = order
+        self.opcode = opcode
+        self.args = args
+        self.target = target
+        self.source = source
+        self.skipped = skipped
+
+
+class FrameStack:
+    """
+    Zásobník lokálnych rámcov, LF je vždy rámec na vrchole zásobníka.
+
+    Každý rámec je samostatný slovník, PUSHFRAME a POPFRAME iba presúvajú referenciu
+    na rámec bez kopírovania. Zahodené dočasné rámce sa vracajú do zásobníka voľných rámcov,
+    z ktorého CREATEFRAME berie nové rámce namiesto ich opakovanej alokácie.
+    """
+    __slots__ = ('frames', 'top', 'limit', 'pool', 'pool_size')
+
+    def __init__(self, limit=FRAME_STACK_LIMIT, pool_size=FRAME_POOL_SIZE):
+        """
+        Parametre
+        ----------
+        limit : int
+            Maximálna hĺbka zásobníka rámcov, pri jej prekročení sa program ukončí s chybou 99
+        pool_size : int
+            Počet vopred alokovaných rámcov pripravených na opätovné použitie
+        """
+        self.frames = []
+        self.top = None
+        self.limit = limit
+        self.pool_size = pool_size
+        self.pool = [{} for _ in range(pool_size)]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __repr__(self):
+        return repr(self.frames)
+
+    def push(self, frame):
+        """ Vloží rámec na vrchol zásobníka, rámec sa stane LF
+        """
+        if len(self.frames) >= self.limit:
+            raise FrameLimitException
+        self.frames.append(frame)
+        self.top = frame
+
+    def pop(self):
+        """ Vyjme rámec z vrcholu zásobníka
+        Ak je zásobník prázdny, program sa ukončí s chybou 55
+        """
+        frames = self.frames
+        if not frames:
+            raise UndeclaredFrameException
+        frame = frames.pop()
+        self.top = frames[-1] if frames else None
+        return frame
+
+    def acquire(self):
+        """ Vráti prázdny rámec zo zásobníka voľných rámcov
+        """
+        if self.pool:
+            return self.pool.pop()
+        return {}
+
+    def release(self, frame):
+        """ Vráti už nepoužívaný rámec do zásobníka voľných rámcov
+        """
+        if len(self.pool) < self.pool_size:
+            frame.clear()
+            self.pool.append(frame)
+
+
+class DataStack:
+    """
+    Dátový zásobník inštrukcií rozšírenia STACK.
+
+    Hodnoty sa ukladajú priamo ako hodnoty v Pythone, ich typ IPPcode20 je daný typom hodnoty
+    (TYPE_NAMES), takže sa pri vyberaní zo zásobníka hodnota ani typ znova nezisťujú.
+    Inštrukcie pracujú priamo so zoznamom values, veľkosť zásobníka kontroluje iba PUSHS,
+    pretože ostatné inštrukcie počet hodnôt na zásobníku nezväčšujú.
+    """
+    __slots__ = ('values', 'limit')
+
+    def __init__(self, limit=DATA_STACK_LIMIT):
+        """
+        Parametre
+        ----------
+        limit : int
+            Maximálny počet hodnôt na zásobníku, pri jeho prekročení sa program ukončí s chybou 99
+        """
+        self.values = []
+        self.limit = limit
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return repr(self.values)
+
+    def clear(self):
+        """ Vyprázdni zásobník
+        """
+        self.values.clear()
+
+
+class OutputBuffer:
+    """
+    Výstup inštrukcie WRITE s vyrovnávacou pamäťou.
+
+    Vypisované reťazce sa ukladajú do zoznamu a do výstupného prúdu sa zapíšu naraz
+    po naplnení vyrovnávacej pamäte (režim full), po každom konci riadka (režim line),
+    pred výpisom na štandardný chybový výstup a pri ukončení programu.
+    """
+    __slots__ = ('stream', 'chunks', 'size', 'limit', 'line_flush')
+
+    def __init__(self, stream, flush="full", limit=OUTPUT_BUFFER_SIZE):
+        """
+        Parametre
+        ----------
+        stream : textový súbor
+            Výstupný prúd (štandardný výstup alebo súbor zadaný parametrom --output)
+        flush : str
+            Spôsob vyprázdňovania vyrovnávacej pamäte - line alebo full
+        limit : int
+            Počet znakov, po ktorom sa vyrovnávacia pamäť vyprázdni
+        """
+        self.stream = stream
+        self.chunks = []
+        self.size = 0
+        self.limit = limit
+        self.line_flush = flush == "line"
+
+    def write(self, text):
+        """ Uloží reťazec do vyrovnávacej pamäte
+        """
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size >= self.limit or (self.line_flush and '\n' in text):
+            self.flush()
+
+    def flush(self):
+        """ Zapíše obsah vyrovnávacej pamäte do výstupného prúdu
+        """
+        if self.chunks:
+            self.stream.write(''.join(self.chunks))
+            self.chunks = []
+            self.size = 0
+        self.stream.flush()
+
+
+class InputReader:
+    """
+    Vstup inštrukcie READ.
+
+    Súbor zadaný parametrom --input sa celý naraz namapuje do pamäte (mmap), štandardný vstup
+    sa číta po veľkých blokoch. Riadky sa vyhľadávajú priamo vo vyrovnávacej pamäti bez jej
+    rozdelenia na zoznam riadkov a skopíruje sa iba riadok, ktorý inštrukcia READ spracuje.
+    """
+    __slots__ = ('stream', 'buffer', 'position', 'eof')
+
+    def __init__(self, stream):
+        """
+        Parametre
+        ----------
+        stream : binárny súbor
+            Súbor so vstupmi alebo štandardný vstup
+        """
+        self.stream = stream
+        self.position = 0
+        try:
+            self.buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            self.eof = True
+        except (OSError, ValueError, io.UnsupportedOperation):
+            # Rúra, terminál alebo prázdny súbor sa nedajú namapovať do pamäte
+            self.buffer = bytearray()
+            self.eof = False
+
+    def fill(self):
+        """ Načíta ďalší blok vstupu do vyrovnávacej pamäte
+        Už spracované riadky sa z vyrovnávacej pamäte odstránia
+        """
+        if self.position:
+            del self.buffer[:self.position]
+            self.position = 0
+        read = getattr(self.stream, 'read1', self.stream.read)
+        chunk = read(INPUT_CHUNK_SIZE)
+        if chunk:
+            self.buffer += chunk
+        else:
+            self.eof = True
+
+    def readline(self):
+        """ Vráti ďalší riadok vstupu bez znaku konca riadka, na konci vstupu vráti None
+        """
+        start = self.position
+        end = self.buffer.find(b'\n', start)
+        while end < 0 and not self.eof:
+            scanned = len(self.buffer) - self.position
+            self.fill()
+            start = self.position
+            end = self.buffer.find(b'\n', start + scanned)
+        if end < 0:
+            end = len(self.buffer)
+            if start >= end:
+                return None
+        line = self.buffer[start:end]
+        self.position = end + 1
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        return bytes(line)
+
+    def read(self, value_type):
+        """ Načíta jednu hodnotu typu value_type (int, float, bool, string)
+        Ak vstup chýba alebo nie je platnou hodnotou daného typu, vráti None (nil)
+        """
+        line = self.readline()
+        if line is None:
+            return None
+        try:
+            if value_type == "int":
+                return int(line)
+            elif value_type == "string":
+                return line.decode()
+            elif value_type == "bool":
+                return line.lower() == b"true"
+            return float.fromhex(line.decode())
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+
+class Statistics:
+    """
+    Štatistiky interpretácie (rozšírenie STATP), zbierajú sa iba s parametrom --stats.
+
+    Počty vykonaní sa ukladajú podľa indexu inštrukcie v programe, na hodnoty order
+    sa prevedú až po skončení interpretácie, takže superinštrukcie a preskočené skoky
+    z optimalizácie (--optimize) sa započítajú pôvodným inštrukciám. Pri chybe v superinštrukcii
+    sa započítajú iba pôvodné inštrukcie po tú, ktorá chybu spôsobila (failed).
+    """
+    __slots__ = ('counts', 'taken', 'variables', 'failed')
+
+    def __init__(self, program):
+        """
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií, ktoré sa bude vykonávať
+        """
+        self.counts = [0] * len(program)
+        self.taken = [0] * len(program)
+        self.variables = 0
+        # (index superinštrukcie, počet vykonaných pôvodných inštrukcií) pri chybe v superinštrukcii
+        self.failed = None
+
+    def orderCounts(self, program):
+        """ Počet vykonaní podľa hodnoty order bez inštrukcií LABEL, DPRINT a BREAK
+        """
+        counts = {}
+        for index, instruction in enumerate(program):
+            executed = self.counts[index]
+            if executed:
+                completed = None
+                if self.failed is not None and self.failed[0] == index:
+                    completed = self.failed[1]
+                for position, source in enumerate(instruction.source or (instruction,)):
+                    if source.opcode not in STATISTICS_EXCLUDED:
+                        # Pôvodné inštrukcie za chybnou sa pri poslednom vykonaní nevykonali
+                        skipped = 1 if completed is not None and position >= completed else 0
+                        if executed - skipped:
+                            counts[source.order] = counts.get(source.order, 0) + executed - skipped
+            if self.taken[index]:
+                for jump in instruction.skipped:
+                    counts[jump.order] = counts.get(jump.order, 0) + self.taken[index]
+        return counts
+
+    def insts(self, program):
+        """ Počet vykonaných inštrukcií (--insts)
+        """
+        return sum(self.orderCounts(program).values())
+
+    def hot(self, program):
+        """ Hodnota order najčastejšie vykonanej inštrukcie (--hot), pri zhode tá s najmenšou hodnotou order
+        """
+        counts = self.orderCounts(program)
+        if not counts:
+            return ""
+        return min(counts, key=lambda order: (-counts[order], order))
+
+    def vars(self):
+        """ Maximálny počet inicializovaných premenných vo všetkých platných rámcoch naraz (--vars)
+        """
+        return self.variables
+
+
+class Profiler:
+    """
+    Profil interpretácie (parameter --profile) - počet vykonaní a celkový čas každej inštrukcie
+    a čas strávený vo funkciách volaných inštrukciou CALL.
+
+    Funkcia je pomenovaná podľa návestia, na ktoré skáče CALL. Celkový čas funkcie je čas od CALL
+    po zodpovedajúci RETURN vrátane vnorených volaní, vlastný čas je čas inštrukcií vykonaných
+    priamo vo funkcii. Kód mimo funkcií sa započíta funkcii PROFILE_MAIN. Pri rekurzii sa celkový
+    čas pripočíta iba za najvonkajšie volanie, vnorené volania tej istej funkcie sú už v ňom.
+    """
+    __slots__ = ('counts', 'times', 'functions', 'calls', 'depths', 'started')
+
+    def __init__(self, program):
+        """
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií, ktoré sa bude vykonávať
+        """
+        self.counts = [0] * len(program)
+        self.times = [0] * len(program)
+        self.functions = {}
+        self.started = time.perf_counter_ns()
+        # Zásobník práve vykonávaných funkcií - [názov, začiatok volania, vlastný čas]
+        self.calls = [[PROFILE_MAIN, self.started, 0]]
+        # Počet práve aktívnych volaní každej funkcie (hĺbka rekurzie)
+        self.depths = {PROFILE_MAIN: 1}
+
+    def enter(self, name):
+        """ Začiatok volania funkcie inštrukciou CALL
+        """
+        self.depths[name] = self.depths.get(name, 0) + 1
+        self.calls.append([name, time.perf_counter_ns(), 0])
+
+    def leave(self):
+        """ Koniec volania funkcie inštrukciou RETURN
+        """
+        name, started, own = self.calls.pop()
+        function = self.functions.setdefault(name, [0, 0, 0])
+        function[0] += 1
+        self.depths[name] -= 1
+        if not self.depths[name]:
+            function[1] += time.perf_counter_ns() - started
+        function[2] += own
+
+    def finish(self):
+        """ Ukončenie všetkých neukončených volaní vrátane hlavného programu na konci interpretácie
+        """
+        while self.calls:
+            self.leave()
+
+    def results(self, program):
+        """ Výsledky profilu ako slovník (formát JSON)
+        """
+        opcodes = {}
+        instructions = []
+        for index, instruction in enumerate(program):
+            if not self.counts[index]:
+                continue
+            name = OPCODE_NAMES[instruction.opcode]
+            opcode = opcodes.setdefault(name, {"opcode": name, "count": 0, "time_ns": 0})
+            opcode["count"] += self.counts[index]
+            opcode["time_ns"] += self.times[index]
+            instructions.append({"order": instruction.order, "opcode": name,
+                                 "count": self.counts[index], "time_ns": self.times[index]})
+
+        functions = [{"label": name, "calls": calls, "time_ns": total, "self_ns": own}
+                     for name, (calls, total, own) in self.functions.items()]
+        return {
+            "instructions_executed": sum(self.counts),
+            "total_ns": sum(self.times),
+            "opcodes": sorted(opcodes.values(), key=lambda item: -item["time_ns"]),
+            "instructions": sorted(instructions, key=lambda item: (-item["time_ns"], item["order"])),
+            "functions": sorted(functions, key=lambda item: -item["time_ns"]),
+        }
+
+    def report(self, program):
+        """ Textová správa profilu zoradená podľa celkového času
+        """
+        results = self.results(program)
+        total = results["total_ns"] or 1
+        lines = ["Profil interpretácie: %d vykonaných inštrukcií, %.3f ms"
+                 % (results["instructions_executed"], results["total_ns"] / 1e6), "",
+                 "Operačné kódy", "%-12s %12s %12s %12s %8s" % ("opcode", "počet", "čas [ms]", "priemer [us]", "podiel")]
+        for item in results["opcodes"]:
+            lines.append("%-12s %12d %12.3f %12.3f %7.1f%%"
+                         % (item["opcode"], item["count"], item["time_ns"] / 1e6,
+                            item["time_ns"] / item["count"] / 1e3, 100 * item["time_ns"] / total))
+
+        lines += ["", "Inštrukcie (prvých %d)" % PROFILE_REPORT_LIMIT,
+                  "%8s %-12s %12s %12s %8s" % ("order", "opcode", "počet", "čas [ms]", "podiel")]
+        for item in results["instructions"][:PROFILE_REPORT_LIMIT]:
+            lines.append("%8d %-12s %12d %12.3f %7.1f%%"
+                         % (item["order"], item["opcode"], item["count"], item["time_ns"] / 1e6,
+                            100 * item["time_ns"] / total))
+
+        lines += ["", "Funkcie (CALL)", "%-24s %10s %14s %16s" % ("návestie", "volania", "celkový [ms]", "vlastný [ms]")]
+        for item in results["functions"]:
+            lines.append("%-24s %10d %14.3f %16.3f"
+                         % (item["label"], item["calls"], item["time_ns"] / 1e6, item["self_ns"] / 1e6))
+        return "\n".join(lines) + "\n"
+
+
+class Sampler:
+    """
+    Vzorkovací profil interpretácie (parameter --sample) vo formáte collapsed stack pre nástroje
+    na kreslenie flamegraph grafov.
+
+    Časovač ITIMER_PROF posiela signál SIGPROF po každom intervale procesorového času. Obsluha
+    signálu nájde v zásobníku volaní Pythonu rámec vykonávacieho cyklu (run, runCompiled, ...),
+    prečíta z neho index práve vykonávanej inštrukcie a uloží ho spolu so zásobníkom volaní
+    interpretu. Medzi signálmi interpretácia nič nemeria, takže réžia závisí iba od intervalu.
+    Pri --engine=compiled sa vzorka preloženého bloku priradí prvej inštrukcii bloku.
+    """
+    __slots__ = ('interpretation', 'interval', 'samples', 'loops')
+
+    def __init__(self, interpretation, interval):
+        """
+        Parametre
+        ----------
+        interpretation : Interpretation
+            Interpretácia, ktorej zásobník volaní sa vzorkuje
+        interval : float
+            Interval vzorkovania v milisekundách procesorového času
+        """
+        self.interpretation = interpretation
+        self.interval = interval / 1000
+        self.samples = {}
+        self.loops = frozenset(loop.__code__ for loop in (Interpretation.run, Interpretation.runCompiled,
+                                                          Interpretation.runStatistics,
+                                                          Interpretation.runProfile))
+
+    def start(self):
+        """ Spustenie časovača
+        """
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        """ Zastavenie časovača
+        """
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def sample(self, signum, frame):
+        """ Obsluha signálu SIGPROF - uloženie jednej vzorky
+        """
+        while frame is not None and frame.f_code not in self.loops:
+            frame = frame.f_back
+        if frame is None:
+            return
+        key = (tuple(self.interpretation.call_stack), frame.f_locals["pc"])
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def collapsed(self, program):
+        """
+        Vzorky vo formáte collapsed stack - na každom riadku zásobník funkcií oddelených bodkočiarkou
+        (PROFILE_MAIN a návestia volaných funkcií), na konci inštrukcia OPCODE:order a počet vzoriek
+        """
+        stacks = {}
+        for (call_stack, pc), count in self.samples.items():
+            if pc >= len(program):
+                continue
+            functions = [PROFILE_MAIN] + [program[address - 1].args[0].value for address in call_stack]
+            instruction = program[pc]
+            functions.append("%s:%d" % (OPCODE_NAMES[instruction.opcode], instruction.order))
+            stack = ";".join(functions)
+            stacks[stack] = stacks.get(stack, 0) + count
+        return "".join("%s %d\n" % item for item in sorted(stacks.items()))
+
+
 class Interpretation:
     """
     Trieda, ktorá interpretuje zdrojový súbor.
 
     Na začiatku prebehne inicializácia triedy.
-    Každý operačný kód sa spracováva samostatne, využíva pri tom metódu switch().
+    Každý operačný kód sa spracováva samostatne vlastnou metódou, ktorá dostane inštrukciu a jej index
+    v programe (pc) a vráti index nasledujúcej inštrukcie. Metódy sú v n-tici handlers zoradené
+    podľa čísla operačného kódu, metóda run() ich volá priamo bez vyhľadávania podľa názvu.
     """
 
-    def __init__(self, global_frame, gf_ind, local_frame, lf_ind, temporary_frame,
-                 call_stack, data_stack):
+    def __init__(self, global_frame, local_frame, temporary_frame, call_stack, data_stack, input_reader, output,
+                 error_output=None):
         """
         Parametre
         ----------
-        global_frame : list v liste
-            Globálny rámec, ktorý slúži na ukladanie globálnych premenných
-        gf_ind : int
-            Umiestnenie indexu v globálnom rámci
-        local_frame : list v liste
-            Lokálny rámec, ktorý slúži na ukladanie lokálnych premenných
-        lf_ind : int
-            Umiestnenie indexu v lokálnom rámci
-        temporary_frame : list
-            Dočasný rámec, ktorý slúži na ukladanie dočasných premenných
+        global_frame : dict
+            Globálny rámec, ktorý slúži na ukladanie globálnych premenných (názov -> hodnota)
+        local_frame : FrameStack
+            Zásobník lokálnych rámcov, LF je rámec na vrchole zásobníka
+        temporary_frame : dict
+            Dočasný rámec, ktorý slúži na ukladanie dočasných premenných, None ak nie je vytvorený
         call_stack : list
             Zásobník, ktorý slúži na volanie funkcií
-        data_stack : list
+        data_stack : DataStack
             Dátový zásobník
+        input_reader : InputReader
+            Vstup inštrukcie READ
+        output : OutputBuffer
+            Výstup inštrukcie WRITE
+        error_output : textový súbor
+            Výstup inštrukcií DPRINT a BREAK (predvolene štandardný chybový výstup)
         """
         self.global_frame = global_frame
         self.local_frame = local_frame
         self.temporary_frame = temporary_frame
-        self.label_frame = label_frame
-        self.gf_ind = gf_ind
-        self.lf_ind = lf_ind
         self.call_stack = call_stack
         self.data_stack = data_stack
+        self.input = input_reader
+        self.output = output
+        self.error_output = error_output or sys.stderr
+        self.handlers = tuple(getattr(self, opcode) for opcode in OPCODE_NAMES)
+
+    def run(self, program, pc=0):
+        """
+        Vykonáva inštrukcie programu od indexu pc, kým index nasledujúcej inštrukcie neprekročí koniec programu
 
-    def switch(self, opcode, root, i):
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií zoradených podľa order
+        pc : int
+            Index prvej vykonanej inštrukcie
         """
-        Metóda pre zmenenie metódy podľa názvu operačného kódu
+        handlers = self.handlers
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            pc = handlers[instruction.opcode](instruction, pc)
+        return pc
+
+    def runCompiled(self, program, pc=0):
         """
-        return getattr(self, opcode)()
+        Vykonáva program po základných blokoch (parameter --engine=compiled)
 
-    def MOVE(self):
-        """ Skopíruje hodnotu <symb> do <var>
+        Základný blok sa prvých COMPILE_THRESHOLD vykonaní interpretuje po inštrukciách, potom sa
+        preloží na funkciu v Pythone, takže sa neprekladá kód, ktorý sa vykoná iba niekoľkokrát
+
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií zoradených podľa order
+        pc : int
+            Index prvej vykonanej inštrukcie, musí to byť začiatok základného bloku
+        """
+        compiler = ProgramCompiler(program, self)
+        leaders = compiler.leaders
+        handlers = self.handlers
+        blocks = [None] * len(program)
+        counts = [0] * len(program)
+        end = len(program)
+        while pc < end:
+            block = blocks[pc]
+            if block is not None:
+                pc = block()
+                continue
+            counts[pc] += 1
+            if counts[pc] >= COMPILE_THRESHOLD:
+                blocks[pc] = compiler.compileBlock(pc)
+                continue
+            instruction = program[pc]
+            pc = handlers[instruction.opcode](instruction, pc)
+            while not leaders[pc]:
+                instruction = program[pc]
+                pc = handlers[instruction.opcode](instruction, pc)
+        return pc
+
+    def runStatistics(self, program, statistics, pc=0):
+        """
+        Vykonáva inštrukcie ako metóda run() a zároveň zbiera štatistiky (parameter --stats)
+
+        Bez parametra --stats sa tento cyklus nepoužíva, takže počítanie štatistík
+        nespomaľuje bežnú interpretáciu. Počet inicializovaných premenných sa zvýši, keď inštrukcia
+        zapíše do neinicializovanej premennej, a znova sa spočíta po CREATEFRAME a POPFRAME,
+        ktoré dočasný rámec zahadzujú.
+
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií zoradených podľa order
+        statistics : Statistics
+            Štatistiky, do ktorých sa počty zapisujú
+        pc : int
+            Index prvej vykonanej inštrukcie
+        """
+        handlers = self.handlers
+        counts = statistics.counts
+        taken = statistics.taken
+        destinations = [destinationVariable(instruction) for instruction in program]
+        frame_resets = (OPCODE_ID["CREATEFRAME"], OPCODE_ID["POPFRAME"])
+        initialized = countInitialized(self.global_frame, self.local_frame, self.temporary_frame)
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            counts[pc] += 1
+            destination = destinations[pc]
+            uninitialized = destination is not None and \
+                isUninitialized(self.global_frame, self.local_frame, self.temporary_frame, destination)
+            try:
+                next_pc = handlers[instruction.opcode](instruction, pc)
+            except Exception:
+                if instruction.source:
+                    statistics.failed = (pc, self.failedComponent(instruction, pc))
+                raise
+            if uninitialized:
+                initialized += 1
+                if initialized > statistics.variables:
+                    statistics.variables = initialized
+            elif instruction.opcode in frame_resets:
+                initialized = countInitialized(self.global_frame, self.local_frame, self.temporary_frame)
+            if instruction.skipped and next_pc == instruction.target:
+                taken[pc] += 1
+            pc = next_pc
+        return pc
+
+    def failedComponent(self, instruction, pc):
+        """ Počet pôvodných inštrukcií superinštrukcie vykonaných po chybu vrátane chybnej
+
+        Superinštrukcia pri chybe nezmení stav interpretu, preto sa pôvodné inštrukcie vykonajú
+        znova po jednej a chyba nastane v tej istej inštrukcii. Používa sa iba pri štatistikách
+        po chybe, ktorá interpretáciu aj tak ukončí.
+        """
+        for position, source in enumerate(instruction.source):
+            try:
+                self.handlers[source.opcode](source, pc)
+            except Exception:
+                return position + 1
+        return len(instruction.source)
+
+    def runProfile(self, program, profiler, pc=0):
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
+        Vykonáva inštrukcie ako metóda run() a meria čas každej inštrukcie (parameter --profile)
 
-        if type_symb[1] == "string":
-            text[1] = stringConversion(text[1])
+        Bez parametra --profile sa tento cyklus nepoužíva, bežná interpretácia sa teda nespomaľuje.
+        Čas inštrukcie, ktorá skončí chybou, sa tiež započíta.
 
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, text[1],
-                                                                                 type_symb[1])
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií zoradených podľa order
+        profiler : Profiler
+            Profil, do ktorého sa počty a časy zapisujú
+        pc : int
+            Index prvej vykonanej inštrukcie
+        """
+        handlers = self.handlers
+        counts = profiler.counts
+        times = profiler.times
+        calls = profiler.calls
+        clock = time.perf_counter_ns
+        call_id = OPCODE_ID["CALL"]
+        return_id = OPCODE_ID["RETURN"]
+        end = len(program)
+        while pc < end:
+            instruction = program[pc]
+            started = clock()
+            try:
+                next_pc = handlers[instruction.opcode](instruction, pc)
+            finally:
+                elapsed = clock() - started
+                counts[pc] += 1
+                times[pc] += elapsed
+                calls[-1][2] += elapsed
+            if instruction.opcode == call_id:
+                profiler.enter(instruction.args[0].value)
+            elif instruction.opcode == return_id:
+                profiler.leave()
+            pc = next_pc
+        return pc
+
+    def MOVE(self, instruction, pc):
+        """ Skopíruje hodnotu <symb> do <var>
+        """
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        value = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, value)
+        return pc + 1
 
-    def CREATEFRAME(self):
+    def CREATEFRAME(self, instruction, pc):
         """ Vytvorí nový dočasný rámec
         """
-        self.temporary_frame = []
+        if self.temporary_frame is not None:
+            self.local_frame.release(self.temporary_frame)
+        self.temporary_frame = self.local_frame.acquire()
+        return pc + 1
 
-    def PUSHFRAME(self):
+    def PUSHFRAME(self, instruction, pc):
         """ Presunie TF na zásobník rámcov
         """
         if self.temporary_frame is None:
             raise UndeclaredFrameException
-        elif self.local_frame is None:
-            self.local_frame = []
-        if self.temporary_frame:
-            self.local_frame.append(self.temporary_frame)
+        self.local_frame.push(self.temporary_frame)
         self.temporary_frame = None
+        return pc + 1
 
-    def POPFRAME(self):
+    def POPFRAME(self, instruction, pc):
         """ Presunie vrcholový rámec LF zo zásobníka rámcov do TF
         """
-        if self.local_frame is None:
-            raise UndeclaredFrameException
-        if self.temporary_frame is None or self.temporary_frame == []:
-            self.temporary_frame = []
-        else:
-            self.temporary_frame.pop()
-        self.temporary_frame.append(self.local_frame.pop())
+        frame = self.local_frame.pop()
+        if self.temporary_frame is not None:
+            self.local_frame.release(self.temporary_frame)
+        self.temporary_frame = frame
+        return pc + 1
 
-    def DEFVAR(self):
+    def DEFVAR(self, instruction, pc):
         """ Definuje premennú v určenom rámci
         """
-        type_symb, text = argumentsXML(root, i)
-        frame = ''.join(text)[:2]
-        variable = ''.join(text)[3:]
-
-        if frame == "GF":
-            self.global_frame.append([])
-            self.global_frame[self.gf_ind].append(variable)
-            for y in self.global_frame:
-                if self.global_frame.count(y) > 1:
-                    raise SemanticException
-            self.gf_ind += 1
-        elif frame == "LF":
-            if self.local_frame is None:
-                raise UndeclaredFrameException
-            self.local_frame.append([])
-            self.local_frame[self.lf_ind].append(variable)
-            for y in self.local_frame:
-                if self.local_frame.count(y) > 1:
-                    raise SemanticException
-            self.lf_ind += 1
-        else:
-            if self.temporary_frame is None:
-                raise UndeclaredFrameException
-            self.temporary_frame.append(variable)
-
-    def CALL(self):
+        var = instruction.args[0]
+        frame = selectFrame(self.global_frame, self.local_frame, self.temporary_frame, var)
+        if var.value in frame:
+            raise SemanticException
+        frame[var.value] = UNINITIALIZED
+        return pc + 1
+
+    def CALL(self, instruction, pc):
         """ Uloží inkrementovanú aktuálnu pozíciu z interného čítača inštrukcií
         do zásobníka volania a vykoná skok na zadané návestie
         """
-        label_symb = labels()
-        self.call_stack.append(i)
-        index = jumpToLabel(label_symb)
-        return index
+        self.call_stack.append(pc + 1)
+        return instruction.target
 
-    def RETURN(self):
+    def RETURN(self, instruction, pc):
         """ Vyjme pozíciu zo zásobníka volania a skočí na túto pozíciu nastavením interného čítača inštrukcií
         """
         if not self.call_stack:
             raise MissingValueException
-        position = self.call_stack.pop()
-        return position + 1
+        return self.call_stack.pop()
 
-    def PUSHS(self):
+    def PUSHS(self, instruction, pc):
         """ Uloží hodnotu na dátový zásobník
+        Konštanta sa uloží priamo bez hľadania v rámcoch, prekročenie veľkosti zásobníka spôsobí chybu 99
         """
-        type_symb, text = argumentsXML(root, i)
-        frame = ''.join(text)[:2]
-        value = ''.join(text)[3:]
-
-        if type_symb == "var" and frame == "GF":
-            try:
-                symb = self.global_frame.index(value)
-            except Exception:
-                raise UndeclaredVariableException
-        elif type_symb == "var" and frame == "LF":
-            try:
-                symb = ''.join(self.local_frame.pop())
-                if symb != value:
-                    raise UndeclaredVariableException
-                self.local_frame.append(symb)
-            except Exception:
-                raise UndeclaredVariableException
-        elif type_symb == "var" and frame == "TF":
-            try:
-                symb = self.temporary_frame.index(value)
-            except Exception:
-                raise UndeclaredVariableException
+        symb = instruction.args[0]
+        if symb.kind == "var":
+            symb = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, symb)
         else:
-            symb = ''.join(text)
-        self.data_stack.append(symb)
-
-    def POPS(self):
+            symb = symb.value
+        stack = self.data_stack
+        if len(stack.values) >= stack.limit:
+            raise DataStackLimitException
+        stack.values.append(symb)
+        return pc + 1
+
+    def POPS(self, instruction, pc):
         """ Vyjme zo zásobníka hodnotu a uloží ju do premennej
         Ak je zásobník prázdny, dôjde k chybe 56
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
+        var = instruction.args[0]
+        loadVariable(self.local_frame, self.temporary_frame, var)
         try:
-            value = self.data_stack.pop()
-        except Exception:
+            value = self.data_stack.values.pop()
+        except IndexError:
             raise MissingValueException
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, value)
+        return pc + 1
 
-        if re.match('^([-+]?\d+)$', str(value)):
-            value_type = "int"
-        elif re.match('^(true|false)$', str(value)):
-            value_type = "bool"
-        elif value == "nil":
-            value_type = "nil"
-        elif re.match('^(([-+]?0x[0-9]\.?[0-9a-f]*p[+-][0-9]*)|(0x[0-9]\.[0-9]+)|([-+]?\.?[0-9]+))$', value):
-            # Rozšírenie FLOAT
-            value_type = "float"
-        else:
-            value_type = "string"
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, value,
-                                                                                 value_type)
+    """ ---------------- Rozšírenie STACK ----------------
 
-    """ ---------------- Rozšírenie STACK ---------------- """
+    Binárne inštrukcie vyberú oba operandy priamo zo zoznamu hodnôt zásobníka, pre najčastejší
+    prípad dvoch celých čísel sa nevolá pomocná funkcia na kontrolu typov
+    """
 
-    def CLEARS(self):
-        self.data_stack = []
+    def CLEARS(self, instruction, pc):
+        self.data_stack.clear()
+        return pc + 1
 
-    def ADDS(self):
+    def ADDS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            result = int(symb1) + int(symb2)
-        except Exception:
-            raise OperandTypeException
-        self.data_stack.append(result)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        values.append(symb1 + symb2)
+        return pc + 1
 
-    def SUBS(self):
+    def SUBS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            result = int(symb1) - int(symb2)
-        except Exception:
-            raise OperandTypeException
-        self.data_stack.append(result)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        values.append(symb1 - symb2)
+        return pc + 1
 
-    def MULS(self):
+    def MULS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            result = int(symb1) * int(symb2)
-        except Exception:
-            raise OperandTypeException
-        self.data_stack.append(result)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        values.append(symb1 * symb2)
+        return pc + 1
 
-    def IDIVS(self):
+    def IDIVS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            result = int(symb1) // int(symb2)
-        except Exception:
+        if type(symb1) is not int or type(symb2) is not int:
+            raise OperandTypeException
+        if symb2 == 0:
             raise ValueOperandException
-        self.data_stack.append(result)
+        values.append(symb1 // symb2)
+        return pc + 1
 
-    def LTS(self):
+    def LTS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if (symb1 == "nil" and symb2 != "nil") or \
-                (symb1 != "nil" and symb2 == "nil"):
-            raise OperandTypeException
-        elif type(symb2) != type(symb1):
-            raise OperandTypeException
-        result = (str(symb1 < symb2)).lower()
-        self.data_stack.append(result)
+        if type(symb1) is not int or type(symb2) is not int:
+            symb1, symb2 = checkOrdered(symb1, symb2)
+        values.append(symb1 < symb2)
+        return pc + 1
 
-    def GTS(self):
+    def GTS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if (symb1 == "nil" and symb2 != "nil") or \
-                (symb1 != "nil" and symb2 == "nil"):
-            raise OperandTypeException
-        elif type(symb2) != type(symb1):
-            raise OperandTypeException
-        result = (str(symb1 > symb2)).lower()
-        self.data_stack.append(result)
+        if type(symb1) is not int or type(symb2) is not int:
+            symb1, symb2 = checkOrdered(symb1, symb2)
+        values.append(symb1 > symb2)
+        return pc + 1
 
-    def EQS(self):
+    def EQS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if type(symb2) != type(symb1):
-            raise OperandTypeException
-        result = (str(symb1 == symb2)).lower()
-        self.data_stack.append(result)
+        values.append(equalValues(symb1, symb2))
+        return pc + 1
 
-    def ANDS(self):
+    def ANDS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if (symb1 != "true" and symb1 != "false") or \
-                (symb1 != "true" and symb1 != "false"):
+        if type(symb1) is not bool or type(symb2) is not bool:
             raise OperandTypeException
-        elif symb1 == "true" and symb2 == "true":
-            result = "true"
-        else:
-            result = "false"
-        self.data_stack.append(result)
+        values.append(symb1 and symb2)
+        return pc + 1
 
-    def ORS(self):
+    def ORS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if (symb1 != "true" and symb1 != "false") or \
-                (symb1 != "true" and symb1 != "false"):
+        if type(symb1) is not bool or type(symb2) is not bool:
             raise OperandTypeException
-        elif symb1 == "true" or symb2 == "true":
-            result = "true"
-        else:
-            result = "false"
-        self.data_stack.append(result)
+        values.append(symb1 or symb2)
+        return pc + 1
 
-    def NOTS(self):
+    def NOTS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if symb1 == "true":
-            result = "false"
-        elif symb1 == "false":
-            result = "true"
-        else:
+        if type(symb1) is not bool:
             raise OperandTypeException
-        self.data_stack.append(result)
+        values.append(not symb1)
+        return pc + 1
 
-    def INT2CHARS(self):
+    def INT2CHARS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            symb1 = int(symb1)
-        except Exception:
-            raise StringOperationException
-        if symb1 < 0 or symb1 > sys.maxunicode:
-            raise StringOperationException
-        result = chr(symb1)
-        self.data_stack.append(result)
+        values.append(intToChar(symb1))
+        return pc + 1
 
-    def STRI2INTS(self):
+    def STRI2INTS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        try:
-            symb1 = stringConversion(symb1)
-            symb2 = int(symb2)
-            if symb2 < 0:
-                raise StringOperationException
-            position = symb1[symb2]
-            result = ord(position)
-        except Exception:
-            raise StringOperationException
-        self.data_stack.append(result)
+        values.append(charToInt(symb1, symb2))
+        return pc + 1
 
-    def JUMPIFEQS(self):
-        label_symb = labels()
+    def JUMPIFEQS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if symb1 == "nil" and symb2 == "nil":
-            result = True
-        elif (symb1 == "nil" and symb2 != "nil") or (symb1 != "nil" and symb2 == "nil"):
-            result = False
-        else:
-            try:
-                result = symb1 == symb2
-            except Exception:
-                raise OperandTypeException
-
-        if result:
-            index = jumpToLabel(label_symb)
-            return index
+        if type(symb1) is int and type(symb2) is int:
+            return instruction.target if symb1 == symb2 else pc + 1
+        if equalValues(symb1, symb2):
+            return instruction.target
         else:
-            return i + 1
+            return pc + 1
 
-    def JUMPIFNEQS(self):
-        label_symb = labels()
+    def JUMPIFNEQS(self, instruction, pc):
+        values = self.data_stack.values
         try:
-            symb2 = self.data_stack.pop()
-            symb1 = self.data_stack.pop()
-        except Exception:
+            symb2 = values.pop()
+            symb1 = values.pop()
+        except IndexError:
             raise MissingValueException
-        if symb1 == "nil" and symb2 == "nil":
-            result = False
-        elif (symb1 == "nil" and symb2 != "nil") or (symb1 != "nil" and symb2 == "nil"):
-            result = True
-        else:
-            try:
-                result = symb1 != symb2
-            except Exception:
-                raise OperandTypeException
-
-        if result:
-            index = jumpToLabel(label_symb)
-            return index
+        if type(symb1) is int and type(symb2) is int:
+            return instruction.target if symb1 != symb2 else pc + 1
+        if not equalValues(symb1, symb2):
+            return instruction.target
         else:
-            return i + 1
+            return pc + 1
 
-    def ADD(self):
+    def ADD(self, instruction, pc):
         """ Sčíta hodnoty rovnakého typu (int/float) a uloží túto hodnotu do premennej
         """
-        symb1, symb2, value_type = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame)
-        result = symb1 + symb2
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type)
+        symb1, symb2 = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0], symb1 + symb2)
+        return pc + 1
 
-    def SUB(self):
+    def SUB(self, instruction, pc):
         """ Odčíta hodnoty rovnakého typu (int/float) a uloží túto hodnotu do premennej
         """
-        symb1, symb2, value_type = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame)
-        result = symb1 - symb2
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type)
+        symb1, symb2 = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0], symb1 - symb2)
+        return pc + 1
 
-    def MUL(self):
+    def MUL(self, instruction, pc):
         """ Vynásobí hodnoty rovnakého typu (int/float) a uloží túto hodnotu do premennej
         """
-        symb1, symb2, value_type = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame)
-        result = symb1 * symb2
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type)
+        symb1, symb2 = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0], symb1 * symb2)
+        return pc + 1
 
-    def IDIV(self):
+    def IDIV(self, instruction, pc):
         """ Vydelí hodnoty typu int a uloží túto hodnotu do premennej
         Delenie nulou spôsobí chybu 57
         """
-        symb1, symb2, value_type = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame)
-        if value_type == "float":
+        symb1, symb2 = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction)
+        if type(symb1) is not int:
             raise OperandTypeException
-        try:
-            result = symb1 // symb2
-        except Exception:
+        if symb2 == 0:
             raise ValueOperandException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="int")
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0], symb1 // symb2)
+        return pc + 1
 
-    def DIV(self):
+    def DIV(self, instruction, pc):
         """ Rozšírenie FLOAT
         Vydelí hodnoty typu float a uloží túto hodnotu do premennej
         Delenie nulou spôsobí chybu 57
         """
-        symb1, symb2, value_type = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame)
-        if value_type == "int":
+        symb1, symb2 = aritmeticalIntructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction)
+        if type(symb1) is not float:
             raise OperandTypeException
-        try:
-            result = symb1 // symb2
-        except Exception:
+        if symb2 == 0:
             raise ValueOperandException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="float")
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0], symb1 / symb2)
+        return pc + 1
 
     """ ---------------- Relačné inštrukcie ---------------- """
 
-    def LT(self):
-        symb1, symb2, type_symb1, type_symb2 = relationalInstructions(self.global_frame, self.local_frame,
-                                                                      self.temporary_frame)
-        if symb1 is None or symb2 is None:
+    def LT(self, instruction, pc):
+        var, symb1, symb2 = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        symb1, symb2 = checkOrdered(symb1, symb2)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 < symb2)
+        return pc + 1
+
+    def GT(self, instruction, pc):
+        var, symb1, symb2 = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        symb1, symb2 = checkOrdered(symb1, symb2)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 > symb2)
+        return pc + 1
+
+    def EQ(self, instruction, pc):
+        var, symb1, symb2 = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, equalValues(symb1, symb2))
+        return pc + 1
+
+    """ ---------------- Booleovské inštrukcie ---------------- """
+
+    def AND(self, instruction, pc):
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        if type(symb1) is not bool or type(symb2) is not bool:
             raise OperandTypeException
-        result = (str(symb1 < symb2)).lower()
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
-
-    def GT(self):
-        symb1, symb2, type_symb1, type_symb2 = relationalInstructions(self.global_frame, self.local_frame,
-                                                                      self.temporary_frame)
-        if symb1 is None or symb2 is None:
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 and symb2)
+        return pc + 1
+
+    def OR(self, instruction, pc):
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        if type(symb1) is not bool or type(symb2) is not bool:
             raise OperandTypeException
-        result = (str(symb1 > symb2)).lower()
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
-
-    def EQ(self):
-        symb1, symb2, type_symb1, type_symb2 = relationalInstructions(self.global_frame, self.local_frame,
-                                                                      self.temporary_frame)
-        if type_symb1 == "nil" and type_symb2 == "nil":
-            result = "true"
-        elif (type_symb1 == "nil" and type_symb2 != "nil") or (type_symb1 != "nil" and type_symb2 == "nil"):
-            result = "false"
-        elif symb1 is None or symb2 is None:
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 or symb2)
+        return pc + 1
+
+    def NOT(self, instruction, pc):
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        if type(symb) is not bool:
             raise OperandTypeException
-        else:
-            result = (str(symb1 == symb2)).lower()
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, not symb)
+        return pc + 1
 
-    """ ---------------- Booleovské inštrukcie ---------------- """
-
-    def AND(self):
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "bool" and type_symb[2] == "bool":
-            text[1] = str(text[1])
-            text[2] = str(text[2])
-            if text[1] == "true" and text[2] == "true":
-                result = "true"
-            else:
-                result = "false"
-        else:
-            raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
-
-    def OR(self):
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "bool" and type_symb[2] == "bool":
-            text[1] = str(text[1])
-            text[2] = str(text[2])
-            if text[1] == "true" or text[2] == "true":
-                result = "true"
-            else:
-                result = "false"
-        else:
-            raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
-
-    def NOT(self):
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-
-        if type_symb[1] == "bool":
-            text[1] = str(text[1])
-            if text[1] == "true":
-                result = "false"
-            else:
-                result = "true"
-        else:
-            raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="bool")
-
-    def INT2CHAR(self):
+    def INT2CHAR(self, instruction, pc):
         """ Konvertuje číselnú hodnotu na znak
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-
-        if type_symb[1] == "int":
-            try:
-                tmp = int(text[1])
-            except Exception:
-                raise StringOperationException
-            if tmp < 0 or tmp > sys.maxunicode:
-                raise StringOperationException
-            result = chr(tmp)
-        else:
-            raise OperandTypeException
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, intToChar(symb))
+        return pc + 1
 
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="string")
-
-    def STRI2INT(self):
+    def STRI2INT(self, instruction, pc):
         """ Konvertuje znak na ordinálnu hodnotu znaku
         """
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "string":
-            try:
-                text[1] = stringConversion(text[1])
-            except Exception:
-                raise StringOperationException
-        else:
-            raise OperandTypeException
-
-        if type_symb[2] == "int":
-            try:
-                text[2] = int(text[2])
-                if text[2] < 0:
-                    raise StringOperationException
-                position = text[1][text[2]]
-                result = ord(position)
-            except Exception:
-                raise StringOperationException
-        else:
-            raise OperandTypeException
-
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="int")
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, charToInt(symb1, symb2))
+        return pc + 1
 
-    def INT2FLOAT(self):
+    def INT2FLOAT(self, instruction, pc):
         """ Rozšírenie FLOAT
-        Konvertuje celé číslo na hexadecimálne číslo
+        Konvertuje celé číslo na desatinné číslo
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-        if type_symb[1] == "int":
-            try:
-                result = float(text[1])
-            except Exception:
-                raise StringOperationException
-        else:
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        if type(symb) is not int:
             raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="float")
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, float(symb))
+        return pc + 1
 
-    def FLOAT2INT(self):
+    def FLOAT2INT(self, instruction, pc):
         """ Rozšírenie FLOAT
-        Konvertuje hexadecimálne číslo na celé číslo
+        Konvertuje desatinné číslo na celé číslo
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-        if type_symb[1] == "float":
-            try:
-                result = int(float.fromhex(text[1]))
-            except Exception:
-                raise StringOperationException
-        else:
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        if type(symb) is not float:
             raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="int")
+        try:
+            result = int(symb)
+        except (OverflowError, ValueError):
+            raise ValueOperandException
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return pc + 1
 
-    def READ(self):
+    def READ(self, instruction, pc):
         """ Načíta jednu hodnotu podľa zadaného typu a uloží túto hodnotu do premennej
+        Ak vstup chýba alebo nie je platnou hodnotou daného typu, uloží sa nil
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if text[1] == "int":
-            try:
-                input_var = int(input())
-            except:
-                text[1] = "nil"
-                input_var = "nil"
-        elif text[1] == "float":
-            try:
-                input_var = float.fromhex(input())
-            except:
-                text[1] = "nil"
-                input_var = "nil"
-        elif text[1] == "string":
-            try:
-                input_var = input()
-            except:
-                text[1] = "nil"
-                input_var = "nil"
-        elif text[1] == "bool":
-            try:
-                input_var = input()
-                if input_var.lower() == "true":
-                    input_var = "true"
-                else:
-                    input_var = "false"
-            except:
-                text[1] = "nil"
-                input_var = "nil"
+        var, read_type = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        input_var = self.input.read(read_type.value)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, input_var)
+        return pc + 1
 
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, input_var,
-                                                                                 text[1])
-
-    def WRITE(self):
+    def WRITE(self, instruction, pc):
         """ Vypíše hodnotu na štandardný výstup
         """
-        type_symb, text = argumentsXML(root, i)
-        if type_symb[0] == "var":
-            text[0], type_symb[0] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[0])
-
-        if type_symb[0] == "bool":
-            if text[0] == "true":
-                print("true", end='')
-            else:
-                print("false", end='')
-        elif type_symb[0] == "nil":
-            print('', end='')
-        elif type_symb[0] == "int":
-            print(text[0], end='')
-        elif type_symb[0] == "float":
-            try:
-                print(float.hex(text[0]), end='')
-            except:
-                print(float.hex(float.fromhex(text[0])), end='')
-        else:
-            text[0] = stringConversion(text[0])
-            print(text[0], end='')
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0])
+        self.output.write(formatValue(symb))
+        return pc + 1
 
-    def CONCAT(self):
+    def CONCAT(self, instruction, pc):
         """ Vykoná spojenie dvoch reťazcov do jedného
         """
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "string" and type_symb[2] == "string":
-            if text[1] is None:
-                text[1] = ""
-            if text[2] is None:
-                text[2] = ""
-            result = text[1] + text[2]
-        else:
-            raise OperandTypeException
-
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="string")
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, concatStrings(symb1, symb2))
+        return pc + 1
 
-    def STRLEN(self):
+    def STRLEN(self, instruction, pc):
         """ Zistí počet znakov v reťazci
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-        if type_symb[1] == "string":
-            if text[1] is None:
-                text[1] = ""
-            result = len(text[1])
-        else:
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+        if type(symb) is not str and type(symb) is not Rope:
             raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="int")
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, len(symb))
+        return pc + 1
 
-    def GETCHAR(self):
+    def GETCHAR(self, instruction, pc):
         """ Do premennej uloží znak na určitej pozícii
         """
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "string" and type_symb[2] == "int":
-            try:
-                text[2] = int(text[2])
-                if text[2] < 0:
-                    raise StringOperationException
-                result = text[1][text[2]]
-            except Exception:
-                raise StringOperationException
-        else:
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        if type(symb1) is Rope:
+            symb1 = symb1.flatten()
+        if type(symb1) is not str or type(symb2) is not int:
             raise OperandTypeException
+        if symb2 < 0 or symb2 >= len(symb1):
+            raise StringOperationException
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1[symb2])
+        return pc + 1
 
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="string")
-
-    def SETCHAR(self):
+    def SETCHAR(self, instruction, pc):
         """Zmodifikuje znak v reťazci
         """
-        type_symb, text = twoOperands(self.global_frame, self.local_frame, self.temporary_frame)
-        variable, var_type = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[0])
-        if var_type == "string" and type_symb[1] == "int" and type_symb[2] == "string":
-            try:
-                text[1] = int(text[1])
-                text[2] = stringConversion(text[2])
-                if text[1] < 0 or text[2] is None:
-                    raise StringOperationException
-                result = variable[:text[1]] + text[2][0] + variable[text[1] + 1:]
-            except Exception:
-                raise StringOperationException
-        else:
+        var = instruction.args[0]
+        symb1, symb2 = twoOperands(self.global_frame, self.local_frame, self.temporary_frame, instruction)
+        variable = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, var)
+        if type(variable) is Rope:
+            variable = variable.flatten()
+        if type(symb2) is Rope:
+            symb2 = symb2.flatten()
+        if type(variable) is not str or type(symb1) is not int or type(symb2) is not str:
             raise OperandTypeException
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="string")
+        if symb1 < 0 or symb1 >= len(variable) or not symb2:
+            raise StringOperationException
+        result = variable[:symb1] + symb2[0] + variable[symb1 + 1:]
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return pc + 1
 
-    def TYPE(self):
+    def TYPE(self, instruction, pc):
         """ Dynamicky zistí typ symbolu
+        Pre neinicializovanú premennú uloží prázdny reťazec
         """
-        type_symb, text = argumentsXML(root, i)
-        loadVariable(self.local_frame, self.temporary_frame, text[0])
-        if type_symb[1] == "var":
-            try:
-                text[1], type_symb[1] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[1])
-            except:
-                value_type = ''
-                self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame,
-                                                                                         self.local_frame,
-                                                                                         self.temporary_frame,
-                                                                                         value_type, "string")
-                return
-        if re.match('^([-+]?\d+)$', str(text[1])):
-            result = "int"
-        elif re.match('^(true|false)$', str(text[1])):
-            result = "bool"
-        elif str(text[1]) == "nil":
-            result = "nil"
-        else:
-            result = "string"
-
-        self.global_frame, self.local_frame, self.temporary_frame = saveVariable(self.global_frame, self.local_frame,
-                                                                                 self.temporary_frame, result,
-                                                                                 value_type="string")
+        var, symb = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        try:
+            symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, symb)
+            result = TYPE_NAMES[type(symb)]
+        except MissingValueException:
+            result = ''
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return pc + 1
 
-    def LABEL(self):
-        pass
+    def LABEL(self, instruction, pc):
+        return pc + 1
 
-    def JUMP(self):
+    def JUMP(self, instruction, pc):
         """ Vykoná nepodmienený skok
         """
-        label_symb = labels()
-        index = jumpToLabel(label_symb)
-        return index
+        return instruction.target
 
-    def JUMPIFEQ(self):
+    def JUMPIFEQ(self, instruction, pc):
         """ Vykoná podmienený skok
         """
-        label_symb = labels()
-        symb1, symb2, type_symb1, type_symb2 = relationalInstructions(self.global_frame, self.local_frame,
-                                                                      self.temporary_frame)
-
-        if type_symb1 == "nil" and type_symb2 == "nil":
-            result = True
-        elif (type_symb1 == "nil" and type_symb2 != "nil") or (type_symb1 != "nil" and type_symb2 == "nil"):
-            result = False
-        elif symb1 is None or symb2 is None:
-            raise OperandTypeException
-        else:
-            result = symb1 == symb2
-
-        if result:
-            index = jumpToLabel(label_symb)
-            return index
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction.args[1], instruction.args[2])
+        if equalValues(symb1, symb2):
+            return instruction.target
         else:
-            return i + 1
+            return pc + 1
 
-    def JUMPIFNEQ(self):
+    def JUMPIFNEQ(self, instruction, pc):
         """ Vykoná podmienený skok
         """
-        label_symb = labels()
-        symb1, symb2, type_symb1, type_symb2 = relationalInstructions(self.global_frame, self.local_frame,
-                                                                      self.temporary_frame)
-
-        if type_symb1 == "nil" and type_symb2 == "nil":
-            result = False
-        elif (type_symb1 == "nil" and type_symb2 != "nil") or (type_symb1 != "nil" and type_symb2 == "nil"):
-            result = True
-        elif symb1 is None or symb2 is None:
-            raise OperandTypeException
-        else:
-            result = symb1 != symb2
-
-        if result:
-            index = jumpToLabel(label_symb)
-            return index
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              instruction.args[1], instruction.args[2])
+        if not equalValues(symb1, symb2):
+            return instruction.target
         else:
-            return i + 1
+            return pc + 1
 
-    def EXIT(self):
+    def EXIT(self, instruction, pc):
         """ Ukončí vykonávanie programu a ukončí interpret
         """
-        type_symb, text = argumentsXML(root, i)
-        if type_symb[0] == "var":
-            text[0], type_symb[0] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[0])
-        if type_symb[0] == "int":
-            try:
-                text[0] = int(text[0])
-                if text[0] < 0 or text[0] > 49:
-                    raise ValueOperandException
-            except Exception:
-                raise ValueOperandException
-        else:
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0])
+        if type(symb) is not int:
             raise OperandTypeException
-        exit(text[0])
+        if symb < 0 or symb > 49:
+            raise ValueOperandException
+        raise ExitException(symb)
 
-    def DPRINT(self):
+    def DPRINT(self, instruction, pc):
         """ Vypíše zadanú hodnotu na štandardný chybový výstup
         """
-        type_symb, text = argumentsXML(root, i)
-        if type_symb[0] == "var":
-            text[0], type_symb[0] = loadConstant(self.global_frame, self.local_frame, self.temporary_frame, text[0])
-        if type_symb[0] == "bool":
-            if text[0] == "true":
-                print("true", end='', file=sys.stderr)
-            else:
-                print("false", end='', file=sys.stderr)
-        elif type_symb[0] == "nil":
-            print('', end='', file=sys.stderr)
-        elif type_symb[0] == "int":
-            print(text[0], end='', file=sys.stderr)
-        elif type_symb[0] == "float":
-            try:
-                print(float.hex(text[0]), end='', file=sys.stderr)
-            except:
-                print(float.hex(float.fromhex(text[0])), end='', file=sys.stderr)
-        else:
-            text[0] = stringConversion(text[0])
-            print(text[0], end='', file=sys.stderr)
+        symb = loadSymbol(self.global_frame, self.local_frame, self.temporary_frame, instruction.args[0])
+        self.output.flush()
+        print(formatValue(symb), end='', file=self.error_output)
+        return pc + 1
 
-    def BREAK(self):
+    def BREAK(self, instruction, pc):
         """ Na štandardný chybový výstup vypíše stav interpretu
         """
-        print("Pozícia v kóde (order):\t", root[i].get('order'), file=sys.stderr)
-        print("Globálny rámec (GF):\t", self.global_frame, file=sys.stderr)
-        print("Lokálny rámec  (LF):\t", self.local_frame, file=sys.stderr)
-        print("Dočasný rámec  (TF):\t", self.temporary_frame, file=sys.stderr)
-        print("Počet vykonaných inštrukcií:", i, file=sys.stderr)
+        self.output.flush()
+        print("Pozícia v kóde (order):\t", instruction.order, file=self.error_output)
+        print("Globálny rámec (GF):\t", self.global_frame, file=self.error_output)
+        print("Lokálny rámec  (LF):\t", self.local_frame, file=self.error_output)
+        print("Dočasný rámec  (TF):\t", self.temporary_frame, file=self.error_output)
+        print("Index inštrukcie v programe:", pc, file=self.error_output)
+        return pc + 1
+
+    """ ---------------- Superinštrukcie (--optimize) ----------------
+
+    Superinštrukcia vykoná postupnosť pôvodných inštrukcií (Instruction.source) naraz,
+    chyby nastávajú v rovnakom poradí a s rovnakou návratovou hodnotou ako pri pôvodných inštrukciách
+    """
+
+    def STACKADD(self, instruction, pc):
+        """ PUSHS <symb1>, PUSHS <symb2>, ADDS, POPS <var>
+        """
+        symb1, symb2 = stackOperands(self.global_frame, self.local_frame, self.temporary_frame, self.data_stack,
+                                     instruction)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        var = instruction.args[2]
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 + symb2)
+        return pc + 1
+
+    def STACKSUB(self, instruction, pc):
+        """ PUSHS <symb1>, PUSHS <symb2>, SUBS, POPS <var>
+        """
+        symb1, symb2 = stackOperands(self.global_frame, self.local_frame, self.temporary_frame, self.data_stack,
+                                     instruction)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        var = instruction.args[2]
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 - symb2)
+        return pc + 1
+
+    def STACKMUL(self, instruction, pc):
+        """ PUSHS <symb1>, PUSHS <symb2>, MULS, POPS <var>
+        """
+        symb1, symb2 = stackOperands(self.global_frame, self.local_frame, self.temporary_frame, self.data_stack,
+                                     instruction)
+        if type(symb1) is not int or type(symb2) is not int:
+            checkNumeric(symb1, symb2)
+        var = instruction.args[2]
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, symb1 * symb2)
+        return pc + 1
+
+    def LTJUMP(self, instruction, pc):
+        """ LT <var> <symb1> <symb2> a JUMPIFEQ/JUMPIFNEQ podľa hodnoty <var>
+        Skok sa vykoná, ak sa výsledok porovnania rovná poslednému operandu
+        """
+        var, symb1, symb2, expected = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        symb1, symb2 = checkOrdered(symb1, symb2)
+        result = symb1 < symb2
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return instruction.target if result == expected.value else pc + 1
+
+    def GTJUMP(self, instruction, pc):
+        """ GT <var> <symb1> <symb2> a JUMPIFEQ/JUMPIFNEQ podľa hodnoty <var>
+        Skok sa vykoná, ak sa výsledok porovnania rovná poslednému operandu
+        """
+        var, symb1, symb2, expected = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        symb1, symb2 = checkOrdered(symb1, symb2)
+        result = symb1 > symb2
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return instruction.target if result == expected.value else pc + 1
+
+    def EQJUMP(self, instruction, pc):
+        """ EQ <var> <symb1> <symb2> a JUMPIFEQ/JUMPIFNEQ podľa hodnoty <var>
+        Skok sa vykoná, ak sa výsledok porovnania rovná poslednému operandu
+        """
+        var, symb1, symb2, expected = instruction.args
+        loadVariable(self.local_frame, self.temporary_frame, var)
+        symb1, symb2 = relationalInstructions(self.global_frame, self.local_frame, self.temporary_frame,
+                                              symb1, symb2)
+        result = equalValues(symb1, symb2)
+        saveVariable(self.global_frame, self.local_frame, self.temporary_frame, var, result)
+        return instruction.target if result == expected.value else pc + 1
 
 
-def labels():
-    """ Pomocná funkcia pre inštrukcie s návestiami (CALL, JUMP, JUMPIFEQ, JUMPIFNEQ)
-    Ak zadané návestie neexistuje, program sa skončí s návratovou hodnotou 52
+def twoOperands(global_frame, local_frame, temporary_frame, instruction):
+    """ Funkcia, ktorá zistí hodnoty operandov <symb1> a <symb2>
     """
-    type_symb, text = argumentsXML(root, i)
-    symb = None
-    for j in range(0, len(label_frame)):
-        if ''.join(label_frame[j][1]) == text[0]:
-            symb = label_frame[j][1]
-            break
-    if symb is None:
-        raise SemanticException
-    return symb
+    symb1 = loadSymbol(global_frame, local_frame, temporary_frame, instruction.args[1])
+    symb2 = loadSymbol(global_frame, local_frame, temporary_frame, instruction.args[2])
 
+    return symb1, symb2
 
-def jumpToLabel(label_symb):
-    """ Funkcia, ktorá skáče na zadané návestie label_symb
-    Vracia hodnotu čísla order
+
+def destinationVariable(instruction):
+    """ Premenná, do ktorej inštrukcia zapisuje výsledok, alebo None
+    Pri superinštrukcii je to premenná poslednej zapisujúcej pôvodnej inštrukcie
     """
-    index = 0
-    while True:
-        try:
-            opcode_tmp = root[index].get('opcode')
-            if opcode_tmp == "LABEL" and root[index][0].text == label_symb:
-                break
-        except:
-            break
-        index += 1
+    if instruction.source is not None:
+        destination = None
+        for source in instruction.source:
+            destination = destinationVariable(source) or destination
+        return destination
+    if OPCODE_OPERANDS[OPCODES[instruction.opcode]][:1] == ("var",) and instruction.opcode != OPCODE_ID["DEFVAR"]:
+        return instruction.args[0]
+    return None
+
+
+def isUninitialized(global_frame, local_frame, temporary_frame, argument):
+    """ Zistí, či je premenná definovaná a zatiaľ neinicializovaná, bez vyhadzovania chýb
+    """
+    if argument.frame == "GF":
+        frame = global_frame
+    elif argument.frame == "LF":
+        frame = local_frame.top
+    else:
+        frame = temporary_frame
+    return frame is not None and frame.get(argument.value) is UNINITIALIZED
+
+
+def countInitialized(global_frame, local_frame, temporary_frame):
+    """ Počet inicializovaných premenných vo všetkých platných rámcoch
+    """
+    frames = [global_frame] + local_frame.frames
+    if temporary_frame is not None:
+        frames.append(temporary_frame)
+    return sum(1 for frame in frames for value in frame.values() if value is not UNINITIALIZED)
+
+
+def writeStatistics(stream, items, statistics, program):
+    """ Zápis štatistík do súboru, každá štatistika na samostatný riadok v poradí parametrov
+    """
+    with stream:
+        for item in items:
+            print(statisticsValue(statistics, item, program), file=stream)
+
+
+def statisticsValue(statistics, item, program):
+    """ Hodnota štatistiky podľa názvu parametra - insts, hot alebo vars
+    """
+    if item == "vars":
+        return statistics.vars()
+    return getattr(statistics, item)(program)
+
 
-    return index
+def writeSamples(stream, sampler, program):
+    """ Zápis vzoriek vzorkovacieho profilu vo formáte collapsed stack
+    """
+    with stream:
+        stream.write(sampler.collapsed(program))
 
 
-def twoOperands(global_frame, local_frame, temporary_frame):
-    """ Funkcia, ktorá zistí typ a hodnotu jednej alebo dvoch premenných
-    Vracia typ premennej/premenných a hodnotu premennej/premenných
+def writeProfile(stream, json_stream, profiler, program):
+    """ Zápis textovej správy profilu a výsledkov vo formáte JSON
     """
-    type_symb, text = argumentsXML(root, i)
-    if type_symb[1] == "var" and type_symb[2] == "var":
-        text[1], type_symb[1] = loadConstant(global_frame, local_frame, temporary_frame, text[1])
-        text[2], type_symb[2] = loadConstant(global_frame, local_frame, temporary_frame, text[2])
-    elif type_symb[1] == "var" and type_symb[2] != "var":
-        text[1], type_symb[1] = loadConstant(global_frame, local_frame, temporary_frame, text[1])
-    elif type_symb[1] != "var" and type_symb[2] == "var":
-        text[2], type_symb[2] = loadConstant(global_frame, local_frame, temporary_frame, text[2])
+    with stream, json_stream:
+        stream.write(profiler.report(program))
+        json.dump(profiler.results(program), json_stream, indent=1)
 
-    return type_symb, text
 
+def stackOperands(global_frame, local_frame, temporary_frame, data_stack, instruction):
+    """ Hodnoty operandov superinštrukcie, ktorá nahrádza dve inštrukcie PUSHS
+    Kontroluje aj veľkosť dátového zásobníka, ako by sa obe hodnoty naň skutočne vložili
+    """
+    symb1 = loadSymbol(global_frame, local_frame, temporary_frame, instruction.args[0])
+    if len(data_stack.values) >= data_stack.limit:
+        raise DataStackLimitException
+    symb2 = loadSymbol(global_frame, local_frame, temporary_frame, instruction.args[1])
+    if len(data_stack.values) + 1 >= data_stack.limit:
+        raise DataStackLimitException
 
-def aritmeticalIntructions(global_frame, local_frame, temporary_frame):
+    return symb1, symb2
+
+
+def aritmeticalIntructions(global_frame, local_frame, temporary_frame, instruction):
     """ Pomocná funkcia pre aritmetické inštrukcie - int aj float
     """
-    type_symb, text = argumentsXML(root, i)
-    loadVariable(local_frame, temporary_frame, text[0])
+    loadVariable(local_frame, temporary_frame, instruction.args[0])
+    symb1, symb2 = twoOperands(global_frame, local_frame, temporary_frame, instruction)
+    checkNumeric(symb1, symb2)
 
-    if type_symb[1] == "var" and type_symb[2] == "var":
-        text[1], type_symb[1] = loadConstant(global_frame, local_frame, temporary_frame, text[1])
-        text[2], type_symb[2] = loadConstant(global_frame, local_frame, temporary_frame, text[2])
-    elif type_symb[1] == "var" and (type_symb[2] == "int" or type_symb[2] == "float"):
-        text[1], type_symb[1] = loadConstant(global_frame, local_frame, temporary_frame, text[1])
-    elif (type_symb[1] == "int" or type_symb[1] == "float") and type_symb[2] == "var":
-        text[2], type_symb[2] = loadConstant(global_frame, local_frame, temporary_frame, text[2])
+    return symb1, symb2
 
-    if type_symb[1] == "int" and type_symb[2] == "int":
-        try:
-            symb1 = int(text[1])
-            symb2 = int(text[2])
-        except Exception:
-            raise OperandTypeException
-        type_returned = "int"
-    elif type_symb[1] == "float" and type_symb[2] == "float":
-        try:
-            symb1 = float.fromhex(text[1])
-            symb2 = float.fromhex(text[2])
-        except Exception:
-            raise OperandTypeException
-        type_returned = "float"
-    else:
+
+def relationalInstructions(global_frame, local_frame, temporary_frame, symb1, symb2):
+    """ Pomocná funkcia pre relačné inštrukcie
+    """
+    symb1 = loadSymbol(global_frame, local_frame, temporary_frame, symb1)
+    symb2 = loadSymbol(global_frame, local_frame, temporary_frame, symb2)
+
+    return symb1, symb2
+
+
+def checkNumeric(symb1, symb2):
+    """ Overí, či sú oba operandy rovnakého číselného typu (int/float)
+    Inak sa program ukončí s chybou 53
+    """
+    value_type = type(symb1)
+    if value_type is not type(symb2) or (value_type is not int and value_type is not float):
         raise OperandTypeException
 
-    return symb1, symb2, type_returned
 
+def checkOrdered(symb1, symb2):
+    """ Overí operandy inštrukcií LT a GT - rovnaký typ, ktorý nie je nil
+    Inak sa program ukončí s chybou 53, vráti operandy, Rope spojený na str
+    """
+    if type(symb1) is Rope:
+        symb1 = symb1.flatten()
+    if type(symb2) is Rope:
+        symb2 = symb2.flatten()
+    if type(symb1) is not type(symb2) or symb1 is None:
+        raise OperandTypeException
+    return symb1, symb2
 
-def relationalInstructions(global_frame, local_frame, temporary_frame):
-    """ Pomocná funkcia pre relačné inštrukcie
+
+def equalValues(symb1, symb2):
+    """ Porovnanie dvoch hodnôt pre inštrukcie EQ, JUMPIFEQ a JUMPIFNEQ
+    Hodnota nil sa dá porovnať s hodnotou ľubovoľného typu, inak musia byť typy rovnaké
     """
-    type_symb, text = twoOperands(global_frame, local_frame, temporary_frame)
-    loadVariable(local_frame, temporary_frame, text[0])
-    symb1 = symb2 = None
+    if symb1 is None or symb2 is None:
+        return symb1 is symb2
+    if type(symb1) is Rope:
+        symb1 = symb1.flatten()
+    if type(symb2) is Rope:
+        symb2 = symb2.flatten()
+    if type(symb1) is not type(symb2):
+        raise OperandTypeException
+    return symb1 == symb2
 
-    if type_symb[1] == "int" and type_symb[2] == "int":
-        try:
-            symb1 = int(text[1])
-            symb2 = int(text[2])
-        except Exception:
-            raise OperandTypeException
-    elif type_symb[1] == "bool" and type_symb[2] == "bool":
-        if text[1] == "false":
-            symb1 = 0
-        elif text[1] == "true":
-            symb1 = 1
-        if text[2] == "false":
-            symb2 = 0
-        elif text[2] == "true":
-            symb2 = 1
-    elif type_symb[1] == "string" and type_symb[2] == "string":
-        symb1 = stringConversion(text[1])
-        symb2 = stringConversion(text[2])
-
-    return symb1, symb2, type_symb[1], type_symb[2]
-
-
-def loadVariable(local_frame, temporary_frame, text):
-    """ Funkcia ktorá zistí, či daný rámec je definovaný
-    Ak nie je, program sa ukončí s chybou 55
+
+def intToChar(symb):
+    """ Prevod celého čísla na znak podľa Unicode
+    Neplatná ordinálna hodnota spôsobí chybu 58
     """
-    frame = ''.join(text)[:2]
-    if frame == "GF":
-        pass
-    elif frame == "LF":
-        if local_frame is None:
-            raise UndeclaredFrameException
-    elif frame == "TF":
-        if temporary_frame is None:
-            raise UndeclaredFrameException
+    if type(symb) is not int:
+        raise OperandTypeException
+    if symb < 0 or symb > sys.maxunicode:
+        raise StringOperationException
+    return chr(symb)
 
 
-def loadConstant(global_frame, local_frame, temporary_frame, text):
-    """ Funkcia, ktorá zistí typ a hodnotu premennej
+def charToInt(symb1, symb2):
+    """ Ordinálna hodnota znaku reťazca symb1 na pozícii symb2
+    Indexácia mimo reťazec spôsobí chybu 58
     """
-    frame = ''.join(text)[:2]
-    value = ''.join(text)[3:]
-    symb = symb_type = None
-    if frame == "GF":
-        for j in range(0, len(global_frame)):
-            if ''.join(global_frame[j][0]) == value:
-                try:
-                    symb_type = global_frame[j][1]
-                    symb = global_frame[j][2]
-                except Exception:
-                    raise MissingValueException
+    if type(symb1) is Rope:
+        symb1 = symb1.flatten()
+    if type(symb1) is not str or type(symb2) is not int:
+        raise OperandTypeException
+    if symb2 < 0 or symb2 >= len(symb1):
+        raise StringOperationException
+    return ord(symb1[symb2])
 
-        if symb is None:
-            raise UndeclaredVariableException
 
-    elif frame == "LF":
+def concatStrings(symb1, symb2):
+    """ Spojenie dvoch reťazcov pre inštrukciu CONCAT, iný typ operandu spôsobí chybu 53
+    Krátky výsledok je str, dlhší ako ROPE_THRESHOLD znakov je Rope, ku ktorému sa ďalšie
+    reťazce pripájajú bez kopírovania
+    """
+    if type(symb2) is Rope:
+        symb2 = symb2.flatten()
+    elif type(symb2) is not str:
+        raise OperandTypeException
+    if type(symb1) is Rope:
+        return symb1.append(symb2)
+    if type(symb1) is not str:
+        raise OperandTypeException
+    if len(symb1) + len(symb2) < ROPE_THRESHOLD:
+        return symb1 + symb2
+    return Rope(RopeBuffer(symb1), len(symb1)).append(symb2)
 
-        if local_frame is None:
+
+def formatValue(symb):
+    """ Textová reprezentácia hodnoty pre inštrukcie WRITE a DPRINT
+    """
+    value_type = type(symb)
+    if value_type is str:
+        return symb
+    elif value_type is Rope:
+        return symb.flatten()
+    elif value_type is bool:
+        return "true" if symb else "false"
+    elif value_type is int:
+        return str(symb)
+    elif value_type is float:
+        return float.hex(symb)
+    return ''
+
+
+def selectFrame(global_frame, local_frame, temporary_frame, argument):
+    """ Funkcia, ktorá vráti rámec premennej
+    Ak daný rámec nie je definovaný, program sa ukončí s chybou 55
+    """
+    frame = argument.frame
+    if frame == "GF":
+        return global_frame
+    elif frame == "LF":
+        if local_frame.top is None:
             raise UndeclaredFrameException
-        try:
-            if local_frame[0][0] != value:
-                raise UndeclaredVariableException
-        except Exception:
-            raise UndeclaredVariableException
-        try:
-            symb_type = local_frame[0][1]
-            symb = local_frame[0][2]
-        except Exception:
-            raise MissingValueException
+        return local_frame.top
+    if temporary_frame is None:
+        raise UndeclaredFrameException
+    return temporary_frame
 
+
+def loadVariable(local_frame, temporary_frame, argument):
+    """ Funkcia ktorá zistí, či daný rámec je definovaný
+    Ak nie je, program sa ukončí s chybou 55
+    """
+    frame = argument.frame
+    if frame == "LF":
+        if local_frame.top is None:
+            raise UndeclaredFrameException
     elif frame == "TF":
         if temporary_frame is None:
             raise UndeclaredFrameException
-        try:
-            temporary_frame.index(value)
-        except Exception:
-            raise UndeclaredVariableException
-        try:
-            symb_type = temporary_frame[1]
-            symb = temporary_frame[2]
-        except Exception:
-            raise MissingValueException
-
-    return symb, symb_type
 
 
-def saveVariable(global_frame, local_frame, temporary_frame, value, value_type):
-    """ Uloženie premennej do rámca
+def loadSymbol(global_frame, local_frame, temporary_frame, argument):
+    """ Funkcia, ktorá vráti hodnotu symbolu - premennej alebo konštanty
     """
-    type_symb, text = argumentsXML(root, i)
-    frame_var = ''.join(text[0])[:2]
-    variable = ''.join(text[0])[3:]
-    check = False
-    if frame_var == "GF":
-        for j in range(0, len(global_frame)):
-            if ''.join(global_frame[j][0]) == variable:
-                check = True
-                break
+    if argument.kind == "var":
+        return loadConstant(global_frame, local_frame, temporary_frame, argument)
+    return argument.value
 
-        if not check:
-            raise UndeclaredVariableException
-        try:
-            global_frame[j].insert(1, value_type)
-            global_frame[j].insert(2, value)
-        except Exception:
-            raise UndeclaredVariableException
-        while len(global_frame[j]) > 3:
-            global_frame[j].pop()
-
-    elif frame_var == "LF":
-        try:
-            var_lf = local_frame.pop()
-            if ''.join(var_lf[0]) != variable:
-                raise UndeclaredVariableException
-            local_frame.append(var_lf)
-        except Exception:
-            raise UndeclaredVariableException
 
-        try:
-            local_frame[0][1] = value_type
-            local_frame[0][2] = value
-        except:
-            local_frame[0].append(value_type)
-            local_frame[0].append(value)
+def loadConstant(global_frame, local_frame, temporary_frame, argument):
+    """ Funkcia, ktorá zistí hodnotu premennej
+    Nedefinovaná premenná spôsobí chybu 54, neinicializovaná premenná chybu 56
+    """
+    frame = selectFrame(global_frame, local_frame, temporary_frame, argument)
+    try:
+        value = frame[argument.value]
+    except KeyError:
+        raise UndeclaredVariableException
+    if value is UNINITIALIZED:
+        raise MissingValueException
+    return value
 
-    elif frame_var == "TF":
-        try:
-            var_tf = temporary_frame[0]
-            if ''.join(var_tf) != variable:
-                raise UndeclaredVariableException
-        except Exception:
-            raise UndeclaredVariableException
-        try:
-            temporary_frame[1] = value_type
-            temporary_frame[2] = value
-        except:
-            temporary_frame.append(value_type)
-            temporary_frame.append(value)
 
-    return global_frame, local_frame, temporary_frame
+def saveVariable(global_frame, local_frame, temporary_frame, argument, value):
+    """ Uloženie premennej do rámca
+    """
+    frame = selectFrame(global_frame, local_frame, temporary_frame, argument)
+    if argument.value not in frame:
+        raise UndeclaredVariableException
+    frame[argument.value] = value
 
 
 def stringConversion(text):
     """ Konverzia stringu s escape sekvenciami na string bez escape sekvencií
+    Reťazec sa prejde iba raz, každá sekvencia \\ddd sa nahradí znakom s kódom ddd
     """
-    symb = text
-    if symb is None:
-        symb = ''
-        return symb
-    index_text = 0
-
-    for character in text:
-        if character == '\\':
-            tmp = text[index_text + 1:index_text + 4]
-            try:
-                if text[index_text + 1] == '0':
-                    tmp = text[index_text + 2:index_text + 4]
-                    if text[index_text + 2] == '0':
-                        tmp = text[index_text + 3:index_text + 4]
-                tmp = chr(int(tmp))
-                symb = symb.replace(text[index_text:index_text + 4], tmp)
-            except:
-                break
+    if '\\' not in text:
+        return text
+    return ESCAPE_SEQUENCE.sub(lambda match: chr(int(match.group(1))), text)
 
-        index_text += 1
 
-    return symb
+def decodeArgument(kind, text):
+    """ Preklad elementu <argN> na predspracovaný operand
+    Premenná sa rozdelí na rámec a názov, konštanty sa prevedú na hodnoty v Pythone
+    (int, bool, float, str, nil ako None), ktoré sa pri vykonávaní už neprevádzajú
+    Escape sekvencie v reťazcových konštantách sa dekódujú iba tu, za behu sú všetky reťazce už dekódované
+    """
+    if kind == "var":
+        return Argument(kind, text[:2], text[3:])
+    if kind == "int":
+        return Argument(kind, None, int(text))
+    if kind == "bool":
+        return Argument(kind, None, text == "true")
+    if kind == "nil":
+        return Argument(kind, None, None)
+    if kind == "float":
+        try:
+            return Argument(kind, None, float.fromhex(text))
+        except ValueError:
+            raise XMLStructureException
+    if kind == "string":
+        return Argument(kind, None, stringConversion(text) if text is not None else "")
+    return Argument(kind, None, text)
 
 
-def argumentsXML(root, i):
-    """ Pomocná funkcia pre inštrukcie
-    Vracia list s typmi operandov a list s hodnotami operandov inštrukcie
+def errorReport(exception):
+    """ Návratová hodnota a chybová hláška výnimky z tabuľky ERRORS
+    Výnimka bez hlášky v tabuľke môže niesť vlastnú hlášku ako argument (chýbajúci súbor)
     """
-    operand = []
-    instruction_type = []
-    count_args = 1
-    for child in list(root[i]):
-        operand.append(root[i].find('arg{}'.format(count_args)).text)
-        instruction_type.append(child.get('type'))
-        count_args += 1
-
-    return instruction_type, operand
+    code, message = ERRORS[type(exception)]
+    if message is None and exception.args:
+        message = str(exception.args[0])
+    return code, message
 
 
 def fileExist(file_in):
-    """ Nájdenie súbor so vstupmi pre samotnú interpretáciu zadaného zdrojového kódu
-    Ak daný súbor neexistuje, program sa ukončí s návratovou hodnotou 11
+    """ Otvorenie vstupného súboru (zdrojový kód alebo vstupy interpretácie) na binárne čítanie
+    Ak daný súbor neexistuje, vyhodí FileInputException (návratová hodnota 11) s hláškou o súbore
     """
     try:
-        file_out = open(file_in)
+        file_out = open(file_in, "rb")
     except IOError:
-        print("Súbor", file_in, "neexistuje!", file=sys.stderr)
-        raise FileInputException
+        raise FileInputException("Súbor %s neexistuje!" % file_in)
     return file_out
 
 
 """ ------------------------ LEXIKÁLNA A SYNTAKTICKÁ ANALÝZA ------------------------ """
 
 
-def countOperands(expected_count, actual_count):
-    if expected_count != actual_count:
+def lexIdentifier(text):
+    """ Identifikátor - prvý znak z IDENTIFIER_START, ďalšie z IDENTIFIER_CHARS """
+    return text != "" and text[0] in IDENTIFIER_START and IDENTIFIER_CHARS.issuperset(text)
+
+
+def lexVariable(text):
+    """ Premenná v tvare rámec@identifikátor """
+    return text[:3] in ("GF@", "LF@", "TF@") and lexIdentifier(text[3:])
+
+
+def lexString(text):
+    """ Reťazcová konštanta bez bielych znakov a znaku #, spätné lomítko musí začínať
+    escape sekvenciu \\ddd s presne troma číslicami
+    """
+    if STRING_FORBIDDEN.search(text):
+        return False
+    index = text.find("\\")
+    while index != -1:
+        escape = text[index + 1:index + 4]
+        if len(escape) != 3 or not escape.isdigit() or not escape.isascii():
+            return False
+        index = text.find("\\", index + 4)
+    return True
+
+
+def lexInt(text):
+    """ Celé číslo v desiatkovej sústave s nepovinným znamienkom """
+    if text[:1] in ("+", "-"):
+        text = text[1:]
+    return text.isdigit() and text.isascii()
+
+
+def lexFloat(text):
+    """ Desatinné číslo v zápise, ktorý prijíma float.fromhex """
+    try:
+        float.fromhex(text)
+    except ValueError:
+        return False
+    return True
+
+
+# Lexikálna kontrola literálov podľa typu operandu, každá kontrola prejde text najviac konštantný počet krát
+LITERAL_LEXERS = {
+    "var": lexVariable,
+    "label": lexIdentifier,
+    "string": lexString,
+    "int": lexInt,
+    "float": lexFloat,
+    "bool": lambda text: text == "true" or text == "false",
+    "nil": lambda text: text == "nil",
+    "type": lambda text: text == "int" or text == "float" or text == "string" or text == "bool",
+}
+
+
+def checkLiteral(text, instruction_type):
+    """ Kontrola textu operandu lexikálnym analyzátorom pre daný typ s lineárnou zložitosťou
+    Reťazcová konštanta môže byť prázdna (element bez textu), ostatné nie
+    """
+    lexer = LITERAL_LEXERS.get(instruction_type)
+    if lexer is None:
+        raise XMLStructureException
+    if text is None:
+        if instruction_type != "string":
+            raise XMLStructureException
+    elif not lexer(text):
         raise XMLStructureException
 
 
 def checkVariable(text, instruction_type):
-    if instruction_type != "var" or not re.match('^((GF|LF|TF)@([A-Za-z_\-$&%*!?])([A-Za-z\d_\-$&%*!?]*))$', text):
+    if instruction_type != "var":
         raise XMLStructureException
+    checkLiteral(text, instruction_type)
 
 
 def checkConstant(text, instruction_type):
-    if instruction_type != "var" and instruction_type != "nil" and instruction_type != "int" and \
-            instruction_type != "float" and instruction_type != "bool" and instruction_type != "string":
+    if instruction_type == "label" or instruction_type == "type":
         raise XMLStructureException
+    checkLiteral(text, instruction_type)
 
-    if text is None and (instruction_type == "var" or instruction_type == "nil" or instruction_type == "int" or
-                         instruction_type == "float" or instruction_type == "bool"):
+
+def checkLabel(text, instruction_type):
+    if instruction_type != "label":
         raise XMLStructureException
+    checkLiteral(text, instruction_type)
+
 
-    if (instruction_type == "var" and not re.match('^((GF|LF|TF)@([A-Za-z_\-$&%*!?])([A-Za-z\d_\-$&%*!?]*))$', text)) \
-            or \
-            (instruction_type == "nil" and text != "nil") or \
-            (instruction_type == "int" and not re.match('^([-+]?\d+)$', text)) or \
-            (instruction_type == "bool" and not re.match('^(true|false)$', text)):
+def checkType(text, instruction_type):
+    if instruction_type != "type":
         raise XMLStructureException
-    elif instruction_type == "string":
-        if text is None:
-            pass
-        elif not re.match('^(([^\n\r\\\\\s#]*(\\\\[0-9]{3})?[^\n\r\\\\\s#]*)*)$', text):
-            raise XMLStructureException
+    checkLiteral(text, instruction_type)
 
 
-def checkLabel(text, instruction_type):
-    if instruction_type != "label" or not re.match('^([A-Za-z_\-$&%*!?])([A-Za-z\d_\-$&%*!?]*)$', text):
+# Kontrola operandu podľa jeho druhu v tabuľke OPCODE_OPERANDS
+OPERAND_CHECKS = {"var": checkVariable, "symb": checkConstant, "label": checkLabel, "type": checkType}
+
+
+def checkOpcode(opcode, operand, instruction_type):
+    """ Kontrola počtu a druhov operandov inštrukcie podľa tabuľky OPCODE_OPERANDS
+    Neznámy operačný kód alebo nesprávne operandy spôsobia chybu 32
+    """
+    kinds = OPCODE_OPERANDS.get(opcode)
+    if kinds is None or len(kinds) != len(operand):
         raise XMLStructureException
 
+    for kind, text, text_type in zip(kinds, operand, instruction_type):
+        OPERAND_CHECKS[kind](text, text_type)
 
-def checkType(text, instruction_type):
-    if instruction_type != "type" or not re.match('^int|float|string|bool$', text):
+
+def decodeInstruction(element, orders):
+    """ Kontrola jedného elementu <instruction> a jeho preklad na predspracovanú inštrukciu
+    Argumenty inštrukcie sa zoradia podľa názvu elementu (arg1, arg2, arg3), množina orders
+    obsahuje už použité hodnoty order, takže kontrola duplicity má konštantnú zložitosť
+    """
+    if element.tag != "instruction":
         raise XMLStructureException
 
+    for name in element.attrib:
+        if name != "order" and name != "opcode":
+            raise XMLStructureException
 
-def checkOpcode(opcode, operand, instruction_type, lst):
-    opcode = opcode.lower()
-
-    if opcode == "move" or opcode == "not" or opcode == "int2char" or opcode == "strlen" or opcode == "type" or \
-            opcode == "int2float" or opcode == "float2int":
-        countOperands(2, len(operand))
-        checkVariable(operand[0], instruction_type[0])
-        checkConstant(operand[1], instruction_type[1])
-    elif opcode == "createframe" or opcode == "pushframe" or opcode == "popframe" or opcode == "return" or \
-            opcode == "clears" or opcode == "adds" or opcode == "subs" or opcode == "muls" or opcode == "idivs" or \
-            opcode == "lts" or opcode == "gts" or opcode == "eqs" or opcode == "ands" or opcode == "ors" or \
-            opcode == "nots" or opcode == "int2chars" or opcode == "stri2ints":
-        countOperands(0, len(operand))
-    elif opcode == "defvar" or opcode == "pops":
-        countOperands(1, len(operand))
-        checkVariable(operand[0], instruction_type[0])
-    elif opcode == "call" or opcode == "jumpifeqs" or opcode == "jumpifneqs":
-        countOperands(1, len(operand))
-        checkLabel(operand[0], instruction_type[0])
-
-    elif opcode == "pushs" or opcode == "write":
-        countOperands(1, len(operand))
-        checkConstant(operand[0], instruction_type[0])
-
-    elif opcode == "add" or opcode == "sub" or opcode == "mul" or opcode == "idiv" or opcode == "div" or \
-            opcode == "lt" or opcode == "gt" or opcode == "eq" or \
-            opcode == "and" or opcode == "or" or opcode == "stri2int" or \
-            opcode == "concat" or opcode == "getchar" or opcode == "setchar":
-        countOperands(3, len(operand))
-        checkVariable(operand[0], instruction_type[0])
-        checkConstant(operand[1], instruction_type[1])
-        checkConstant(operand[2], instruction_type[2])
-
-    elif opcode == "read":
-        countOperands(2, len(operand))
-        checkVariable(operand[0], instruction_type[0])
-        checkType(operand[1], instruction_type[1])
-
-    elif opcode == "label":
-        countOperands(1, len(operand))
-        checkLabel(operand[0], instruction_type[0])
-        label_frame.append([])
-        for j in range(0, len(label_frame)):
-            if not label_frame[j]:
-                continue
+    opcode = element.get('opcode')
+    try:
+        tmp = int(element.get('order'))
+    except (TypeError, ValueError):
+        raise XMLStructureException
+    if tmp <= 0 or tmp in orders or opcode is None:
+        raise XMLStructureException
+    orders.add(tmp)
+    opcode = opcode.upper()
 
-            elif ''.join(label_frame[j][1]) == operand[0]:
-                raise SemanticException
-        label_frame[len(label_frame) - 1].append(lst[len(lst) - 1])
-        label_frame[len(label_frame) - 1].append(operand[0])
+    count_args = 1
+    operand = []
+    instruction_type = []
+    for child in sorted(element, key=lambda child: child.tag):
+        argument, arg_num = child.tag[:3], child.tag[3:]
+        try:
+            arg_num = int(arg_num)
+            if argument[:3] != "arg" or arg_num <= 0 or arg_num >= 4 or arg_num != count_args:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise XMLStructureException
 
-    elif opcode == "jump":
-        countOperands(1, len(operand))
-        checkLabel(operand[0], instruction_type[0])
+        operand.append(child.text)
+        instruction_type.append(child.get('type'))
+        count_args += 1
+    checkOpcode(opcode, operand, instruction_type)
 
-    elif opcode == "jumpifeq" or opcode == "jumpifneq":
-        countOperands(3, len(operand))
-        checkLabel(operand[0], instruction_type[0])
-        checkConstant(operand[1], instruction_type[1])
-        checkConstant(operand[2], instruction_type[2])
-    elif opcode == "exit" or opcode == "dprint":
-        countOperands(1, len(operand))
-        checkConstant(operand[0], instruction_type[0])
+    args = tuple(decodeArgument(kind, text) for kind, text in zip(instruction_type, operand))
+    return Instruction(tmp, OPCODE_ID[opcode], args)
 
-    elif opcode == "break":
-        countOperands(0, len(operand))
 
-    else:
-        raise XMLStructureException
+def linkProgram(program):
+    """ Zoradenie inštrukcií podľa hodnoty order a vytvorenie tabuľky návestí
+    Skokovým inštrukciám sa priradí index cieľového návestia, duplicitné návestie
+    alebo skok na neexistujúce návestie spôsobí chybu 52
+    """
+    program.sort(key=lambda instruction: instruction.order)
+
+    label_frame = {}
+    label_id = OPCODE_ID["LABEL"]
+    for index, instruction in enumerate(program):
+        if instruction.opcode == label_id:
+            if instruction.args[0].value in label_frame:
+                raise SemanticException
+            label_frame[instruction.args[0].value] = index
+
+    for instruction in program:
+        if instruction.opcode in JUMP_OPCODES:
+            try:
+                instruction.target = label_frame[instruction.args[0].value]
+            except KeyError:
+                raise SemanticException
+
+    return program
 
 
 def sourceXml(source_file):
-    """ Funkcia, ktorá slúži na lexikálnu analýzu zadaného súboru s XML
-    Funkcia zoradí inštrukcie podľa hodnoty order a taktiež argumenty inštrukcií
+    """ Funkcia, ktorá slúži na lexikálnu a syntaktickú analýzu zadaného XML (súbor alebo štandardný vstup)
+    XML sa číta jediným prechodom pomocou iterparse, každý element <instruction> sa hneď po načítaní
+    skontroluje, preloží na predspracovanú inštrukciu a uvoľní, takže sa nikdy nevytvára celý strom XML.
+    Vracia pole inštrukcií zoradených podľa hodnoty order
     """
-    fileExist(source_file)
+    stream = fileExist(source_file) if isinstance(source_file, (str, os.PathLike)) else source_file
+
+    program = []
+    orders = set()
+    structure_error = False
+    root = None
+    depth = 0
     try:
-        tree = ElementTree.parse(source_file)
-        root = tree.getroot()
-        x = ElementTree.fromstring(open(source_file).read())
-        ElementTree.iterparse(source_file)
-        x.find('.')
-        x.findall("*")
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = element
+                    if root.tag != "program":
+                        structure_error = True
+                    for name in root.attrib:
+                        if name != "language" and name != "name" and name != "description":
+                            structure_error = True
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+            # Štrukturálna chyba sa ohlási až po načítaní celého XML, aby mala prednosť chyba formátu XML
+            if not structure_error:
+                try:
+                    program.append(decodeInstruction(element, orders))
+                except XMLStructureException:
+                    structure_error = True
+            root.clear()
     except ElementTree.ParseError:
         raise XMLFormatException
+    finally:
+        if stream is not source_file:
+            stream.close()
 
-    try:
-        root[:] = sorted(root, key=lambda child: (child.tag, int(child.get('order'))))
-        for child in root:
-            child[:] = sorted(child, key=lambda child: (child.tag, child.tag))
-    except Exception:
+    if structure_error:
         raise XMLStructureException
 
-    i = 0
-    lst = []
-    while True:
+    return linkProgram(program)
+
+
+""" ------------------------ PREKLAD PROGRAMU DO PYTHONU ------------------------ """
+
+
+class ProgramCompiler:
+    """
+    Preklad základných blokov programu na funkcie v Pythone (parameter --engine=compiled).
+
+    Program sa rozdelí na základné bloky - blok začína na začiatku programu, na cieli skoku
+    a za každou inštrukciou, ktorá mení poradie vykonávania (skoky, CALL, RETURN, EXIT).
+    Zo základného bloku sa vygeneruje zdrojový kód jednej funkcie, ktorá vykoná všetky jeho
+    inštrukcie a vráti index nasledujúcej inštrukcie. Prístup k premennej je priamo prístup
+    do slovníka rámca a konštanty sú vložené priamo do kódu. Inštrukcie, ktoré prekladač nepozná,
+    volajú metódu triedy Interpretation, takže výsledky aj chybové návratové hodnoty sú rovnaké
+    ako pri interpretácii.
+    """
+
+    def __init__(self, program, interpretation):
+        """
+        Parametre
+        ----------
+        program : list
+            Pole predspracovaných inštrukcií
+        interpretation : Interpretation
+            Stav interpretu, s ktorým pracujú vygenerované funkcie
+        """
+        self.program = program
+        self.constants = []
+        self.lines = []
+        self.names = 0
+
+        # leaders[index] je 1, ak na indexe začína základný blok, koniec programu je tiež začiatok bloku
+        self.leaders = bytearray(len(program) + 1)
+        self.leaders[0] = 1
+        self.leaders[len(program)] = 1
+        for index, instruction in enumerate(program):
+            if instruction.target is not None:
+                self.leaders[instruction.target] = 1
+            if instruction.target is not None or instruction.opcode in BLOCK_END_OPCODES:
+                self.leaders[index + 1] = 1
+
+        self.namespace = {
+            "gf": interpretation.global_frame, "lf": interpretation.local_frame, "it": interpretation,
+            "H": interpretation.handlers, "I": program, "K": self.constants,
+            "S": interpretation.data_stack.values, "S_LIMIT": interpretation.data_stack.limit,
+            "write": interpretation.output.write, "UNINITIALIZED": UNINITIALIZED,
+            "checkNumeric": checkNumeric, "checkOrdered": checkOrdered, "equalValues": equalValues,
+            "formatValue": formatValue, "concatStrings": concatStrings, "Rope": Rope,
+            "OperandTypeException": OperandTypeException,
+            "UndeclaredVariableException": UndeclaredVariableException,
+            "UndeclaredFrameException": UndeclaredFrameException, "MissingValueException": MissingValueException,
+            "ValueOperandException": ValueOperandException, "DataStackLimitException": DataStackLimitException,
+        }
+
+    def compileBlock(self, start):
+        """ Preloží základný blok začínajúci na indexe start a vráti jeho funkciu
+        """
+        self.lines = []
+        index = start
+        while True:
+            instruction = self.program[index]
+            compiler = getattr(self, OPCODE_NAMES[instruction.opcode], None)
+            if compiler is None:
+                self.fallback(index, instruction)
+            else:
+                compiler(index, instruction)
+            index += 1
+            if self.leaders[index]:
+                break
+        if not self.lines or not self.lines[-1].startswith("return "):
+            self.emit("return %d" % index)
+
+        source = ("def block_%d():\n    try:\n%s\n"
+                  "    except KeyError:\n        raise UndeclaredVariableException from None\n"
+                  % (start, "\n".join("        " + line for line in self.lines)))
+        exec(compile(source, "<ippcode20>", "exec"), self.namespace)
+        return self.namespace["block_%d" % start]
+
+    """ ---------------- Generovanie kódu ---------------- """
+
+    def emit(self, line):
+        self.lines.append(line)
+
+    def name(self):
+        """ Nový názov pomocnej premennej vo vygenerovanej funkcii
+        """
+        self.names += 1
+        return "v%d" % self.names
+
+    def constant(self, value):
+        """ Výraz s hodnotou konštanty, čísla, bool a nil sa vložia priamo do kódu
+        """
+        if value is None or type(value) is bool or type(value) is int:
+            return repr(value)
+        self.constants.append(value)
+        return "K[%d]" % (len(self.constants) - 1)
+
+    def checkFrame(self, argument):
+        """ Kontrola existencie rámca premennej (ako loadVariable), chyba 55
+        """
+        if argument.frame == "LF":
+            self.emit("if lf.top is None: raise UndeclaredFrameException")
+        elif argument.frame == "TF":
+            self.emit("if it.temporary_frame is None: raise UndeclaredFrameException")
+
+    def frame(self, argument):
+        """ Výraz s rámcom premennej (ako selectFrame)
+        """
+        if argument.frame == "GF":
+            return "gf"
+        frame = self.name()
+        self.emit("%s = %s" % (frame, "lf.top" if argument.frame == "LF" else "it.temporary_frame"))
+        self.emit("if %s is None: raise UndeclaredFrameException" % frame)
+        return frame
+
+    def load(self, argument):
+        """ Výraz s hodnotou symbolu (ako loadSymbol), chyby 54, 55 a 56
+        """
+        if argument.kind != "var":
+            return self.constant(argument.value)
+        frame = self.frame(argument)
+        value = self.name()
+        self.emit("%s = %s[%r]" % (value, frame, argument.value))
+        self.emit("if %s is UNINITIALIZED: raise MissingValueException" % value)
+        return value
+
+    def store(self, argument, expression):
+        """ Uloženie hodnoty do premennej (ako saveVariable), chyby 54 a 55
+        """
+        frame = self.frame(argument)
+        self.emit("if %r not in %s: raise UndeclaredVariableException" % (argument.value, frame))
+        self.emit("%s[%r] = %s" % (frame, argument.value, expression))
+
+    def fallback(self, index, instruction):
+        """ Inštrukcia bez prekladu sa vykoná metódou triedy Interpretation
+        """
+        if instruction.target is not None or instruction.opcode in BLOCK_END_OPCODES:
+            self.emit("return H[%d](I[%d], %d)" % (instruction.opcode, index, index))
+        else:
+            self.emit("H[%d](I[%d], %d)" % (instruction.opcode, index, index))
+
+    def arithmetic(self, instruction):
+        var, symb1, symb2 = instruction.args
+        self.checkFrame(var)
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        self.emit("if type(%s) is not int or type(%s) is not int: checkNumeric(%s, %s)" % (symb1, symb2, symb1, symb2))
+        return var, symb1, symb2
+
+    def compare(self, instruction, operator):
+        var, symb1, symb2 = instruction.args
+        self.checkFrame(var)
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        # Rope spojený funkciou checkOrdered sa priradí späť iba do pomocnej premennej, nie do konštanty
+        targets = ", ".join(symb if argument.kind == "var" else "_"
+                            for argument, symb in zip(instruction.args[1:], (symb1, symb2)))
+        self.emit("if type(%s) is not int or type(%s) is not int: %s = checkOrdered(%s, %s)"
+                  % (symb1, symb2, targets, symb1, symb2))
+        self.store(var, "%s %s %s" % (symb1, operator, symb2))
+
+    def equal(self, symb1, symb2):
+        """ Výraz s výsledkom porovnania (ako equalValues)
+        """
+        result = self.name()
+        self.emit("%s = %s == %s if type(%s) is int and type(%s) is int else equalValues(%s, %s)"
+                  % (result, symb1, symb2, symb1, symb2, symb1, symb2))
+        return result
+
+    """ ---------------- Preklad jednotlivých inštrukcií ---------------- """
+
+    def LABEL(self, index, instruction):
+        pass
+
+    def MOVE(self, index, instruction):
+        var, symb = instruction.args
+        self.checkFrame(var)
+        self.store(var, self.load(symb))
+
+    def ADD(self, index, instruction):
+        var, symb1, symb2 = self.arithmetic(instruction)
+        self.store(var, "%s + %s" % (symb1, symb2))
+
+    def SUB(self, index, instruction):
+        var, symb1, symb2 = self.arithmetic(instruction)
+        self.store(var, "%s - %s" % (symb1, symb2))
+
+    def MUL(self, index, instruction):
+        var, symb1, symb2 = self.arithmetic(instruction)
+        self.store(var, "%s * %s" % (symb1, symb2))
+
+    def IDIV(self, index, instruction):
+        var, symb1, symb2 = self.arithmetic(instruction)
+        self.emit("if type(%s) is not int: raise OperandTypeException" % symb1)
+        self.emit("if %s == 0: raise ValueOperandException" % symb2)
+        self.store(var, "%s // %s" % (symb1, symb2))
+
+    def LT(self, index, instruction):
+        self.compare(instruction, "<")
+
+    def GT(self, index, instruction):
+        self.compare(instruction, ">")
+
+    def EQ(self, index, instruction):
+        var, symb1, symb2 = instruction.args
+        self.checkFrame(var)
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        self.store(var, self.equal(symb1, symb2))
+
+    def AND(self, index, instruction):
+        var, symb1, symb2 = instruction.args
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        self.checkFrame(var)
+        self.emit("if type(%s) is not bool or type(%s) is not bool: raise OperandTypeException" % (symb1, symb2))
+        self.store(var, "%s and %s" % (symb1, symb2))
+
+    def OR(self, index, instruction):
+        var, symb1, symb2 = instruction.args
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        self.checkFrame(var)
+        self.emit("if type(%s) is not bool or type(%s) is not bool: raise OperandTypeException" % (symb1, symb2))
+        self.store(var, "%s or %s" % (symb1, symb2))
+
+    def NOT(self, index, instruction):
+        var, symb = instruction.args
+        self.checkFrame(var)
+        symb = self.load(symb)
+        self.emit("if type(%s) is not bool: raise OperandTypeException" % symb)
+        self.store(var, "not %s" % symb)
+
+    def CONCAT(self, index, instruction):
+        var, symb1, symb2 = instruction.args
+        symb1, symb2 = self.load(symb1), self.load(symb2)
+        self.checkFrame(var)
+        result = self.name()
+        self.emit("%s = %s + %s if type(%s) is str and type(%s) is str and len(%s) + len(%s) < %d "
+                  "else concatStrings(%s, %s)"
+                  % (result, symb1, symb2, symb1, symb2, symb1, symb2, ROPE_THRESHOLD, symb1, symb2))
+        self.store(var, result)
+
+    def STRLEN(self, index, instruction):
+        var, symb = instruction.args
+        self.checkFrame(var)
+        symb = self.load(symb)
+        self.emit("if type(%s) is not str and type(%s) is not Rope: raise OperandTypeException" % (symb, symb))
+        self.store(var, "len(%s)" % symb)
+
+    def WRITE(self, index, instruction):
+        self.emit("write(formatValue(%s))" % self.load(instruction.args[0]))
+
+    def PUSHS(self, index, instruction):
+        symb = self.load(instruction.args[0])
+        self.emit("if len(S) >= S_LIMIT: raise DataStackLimitException")
+        self.emit("S.append(%s)" % symb)
+
+    def POPS(self, index, instruction):
+        var = instruction.args[0]
+        self.checkFrame(var)
+        self.emit("if not S: raise MissingValueException")
+        self.store(var, "S.pop()")
+
+    def JUMP(self, index, instruction):
+        self.emit("return %d" % instruction.target)
+
+    def JUMPIFEQ(self, index, instruction):
+        label, symb1, symb2 = instruction.args
+        result = self.equal(self.load(symb1), self.load(symb2))
+        self.emit("return %d if %s else %d" % (instruction.target, result, index + 1))
+
+    def JUMPIFNEQ(self, index, instruction):
+        label, symb1, symb2 = instruction.args
+        result = self.equal(self.load(symb1), self.load(symb2))
+        self.emit("return %d if not %s else %d" % (instruction.target, result, index + 1))
+
+
+""" ------------------------ OPTIMALIZÁCIA PROGRAMU ------------------------ """
+
+# Zásobníkové aritmetické inštrukcie, ktoré sa s dvoma PUSHS a jedným POPS spoja do superinštrukcie
+STACK_FUSIONS = {OPCODE_ID["ADDS"]: OPCODE_ID["STACKADD"], OPCODE_ID["SUBS"]: OPCODE_ID["STACKSUB"],
+                 OPCODE_ID["MULS"]: OPCODE_ID["STACKMUL"]}
+# Relačné inštrukcie, ktoré sa s nasledujúcim podmieneným skokom spoja do superinštrukcie
+COMPARE_FUSIONS = {OPCODE_ID["LT"]: OPCODE_ID["LTJUMP"], OPCODE_ID["GT"]: OPCODE_ID["GTJUMP"],
+                   OPCODE_ID["EQ"]: OPCODE_ID["EQJUMP"]}
+
+
+def branchCondition(var, jump):
+    """ Hodnota premennej var, pri ktorej podmienený skok jump skočí, alebo None,
+    ak skok neporovnáva práve premennú var s konštantou typu bool
+    """
+    label, symb1, symb2 = jump.args
+    if symb2.kind == "var":
+        symb1, symb2 = symb2, symb1
+    if symb1.kind != "var" or symb1.frame != var.frame or symb1.value != var.value or symb2.kind != "bool":
+        return None
+    if jump.opcode == OPCODE_ID["JUMPIFEQ"]:
+        return symb2.value
+    return not symb2.value
+
+
+def fuseInstructions(program, index):
+    """ Nahradí postupnosť inštrukcií začínajúcu na indexe superinštrukciou
+    Vracia inštrukciu a počet pôvodných inštrukcií, ktoré nahrádza
+    """
+    first = program[index]
+    following = program[index + 1:index + 4]
+
+    if first.opcode == OPCODE_ID["PUSHS"] and len(following) == 3 and following[0].opcode == OPCODE_ID["PUSHS"] \
+            and following[1].opcode in STACK_FUSIONS and following[2].opcode == OPCODE_ID["POPS"]:
+        args = (first.args[0], following[0].args[0], following[2].args[0])
+        return Instruction(first.order, STACK_FUSIONS[following[1].opcode], args,
+                           source=tuple(program[index:index + 4])), 4
+
+    if first.opcode in COMPARE_FUSIONS and following and \
+            (following[0].opcode == OPCODE_ID["JUMPIFEQ"] or following[0].opcode == OPCODE_ID["JUMPIFNEQ"]):
+        jump = following[0]
+        expected = branchCondition(first.args[0], jump)
+        if expected is not None:
+            args = first.args + (Argument("bool", None, expected),)
+            return Instruction(first.order, COMPARE_FUSIONS[first.opcode], args, jump.target,
+                               source=(first, jump)), 2
+
+    return first, 1
+
+
+def threadJumps(program):
+    """ Skok na inštrukciu JUMP sa presmeruje priamo na jej cieľ, preskočené inštrukcie JUMP
+    sa uložia do Instruction.skipped, aby štatistiky započítali aj ich vykonanie
+    Cyklus zložený iba zo skokov JUMP a skok, ktorého cieľ by bol nasledujúca inštrukcia, sa nemenia
+    """
+    jump_id = OPCODE_ID["JUMP"]
+    threaded = []
+    for index, instruction in enumerate(program):
+        if instruction.target is None:
+            continue
+        target = instruction.target
+        skipped = []
+        while target < len(program) and program[target].opcode == jump_id:
+            if program[target] in skipped:
+                break
+            skipped.append(program[target])
+            target = program[target].target
+        else:
+            if skipped and target != index + 1:
+                threaded.append((instruction, target, tuple(skipped)))
+
+    for instruction, target, skipped in threaded:
+        instruction.target = target
+        instruction.skipped = skipped
+
+
+def optimizeProgram(program):
+    """ Optimalizácia predspracovaného programu (parameter --optimize)
+    Vynechá inštrukcie LABEL, spojí časté postupnosti inštrukcií do superinštrukcií
+    a skoky na inštrukciu JUMP presmeruje priamo na jej cieľ. Skoky smerujú vždy na návestie,
+    takže vnútri spájanej postupnosti nemôže byť cieľ žiadneho skoku
+    """
+    optimized = []
+    new_index = [0] * (len(program) + 1)
+    index = 0
+    while index < len(program):
+        new_index[index] = len(optimized)
+        if program[index].opcode == OPCODE_ID["LABEL"]:
+            index += 1
+            continue
+        instruction, count = fuseInstructions(program, index)
+        optimized.append(instruction)
+        index += count
+    new_index[len(program)] = len(optimized)
+
+    for instruction in optimized:
+        if instruction.target is not None:
+            instruction.target = new_index[instruction.target]
+    threadJumps(optimized)
+
+    return optimized
+
+
+""" ------------------------ VYROVNÁVACIA PAMÄŤ PROGRAMOV ------------------------ """
+
+
+@functools.lru_cache(maxsize=None)
+def interpreterVersion():
+    """ Verzia interpretu pre kľúč vyrovnávacej pamäte - odtlačok zdrojového kódu interpretu
+    a verzie Pythonu, takže akákoľvek zmena interpretu zneplatní uložené programy
+    Zdrojový kód sa prečíta iba raz za beh procesu (dávkový režim načíta veľa programov)
+    """
+    digest = hashlib.sha256(sys.version.encode())
+    digest.update(b"%d" % marshal.version)
+    try:
+        with open(os.path.abspath(__file__), "rb") as source:
+            digest.update(source.read())
+    except OSError:
+        pass
+    return digest.digest()
+
+
+def programKey(stream):
+    """ Kľúč programu vo vyrovnávacej pamäti - SHA-256 z verzie interpretu a obsahu XML
+    """
+    digest = hashlib.sha256(interpreterVersion())
+    chunk = stream.read(INPUT_CHUNK_SIZE)
+    while chunk:
+        digest.update(chunk)
+        chunk = stream.read(INPUT_CHUNK_SIZE)
+    return digest.hexdigest()
+
+
+def serializeProgram(program):
+    """ Predspracovaný program ako n-tice základných hodnôt uložené vo formáte marshal a skomprimované
+    """
+    return zlib.compress(marshal.dumps(tuple(
+        (instruction.order, instruction.opcode,
+         tuple((argument.kind, argument.frame, argument.value) for argument in instruction.args), instruction.target)
+        for instruction in program)), 1)
+
+
+def deserializeProgram(data):
+    """ Obnovenie predspracovaného programu zo serializovaných dát
+    """
+    return [Instruction(order, opcode, tuple(Argument(kind, frame, value) for kind, frame, value in args), target)
+            for order, opcode, args, target in marshal.loads(zlib.decompress(data))]
+
+
+def loadCachedProgram(directory, key):
+    """ Načítanie programu z vyrovnávacej pamäte, pri chýbajúcom alebo poškodenom súbore vráti None
+    Čas poslednej zmeny súboru sa aktualizuje, podľa neho sa mažú najdlhšie nepoužité programy
+    """
+    path = os.path.join(directory, key + CACHE_SUFFIX)
+    try:
+        with open(path, "rb") as cached:
+            program = deserializeProgram(cached.read())
+        os.utime(path)
+    except (OSError, EOFError, ValueError, TypeError, zlib.error):
+        return None
+    return program
+
+
+def storeCachedProgram(directory, key, program):
+    """ Uloženie programu do vyrovnávacej pamäte, chyby pri zápise sa ignorujú
+    Súbor sa zapíše pod dočasným názvom a premenuje, takže súbežne spustené interprety
+    nikdy nenačítajú neúplný súbor
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(descriptor, "wb") as cached:
+            cached.write(serializeProgram(program))
+        os.replace(temporary, os.path.join(directory, key + CACHE_SUFFIX))
+        evictCache(directory, CACHE_SIZE_LIMIT)
+    except OSError:
         try:
-            tmp = root[i].attrib['order']
-        except:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def evictCache(directory, limit):
+    """ Zmaže najdlhšie nepoužité programy, kým celková veľkosť vyrovnávacej pamäte neklesne pod limit
+    """
+    entries = []
+    total = 0
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if entry.name.endswith(CACHE_SUFFIX):
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+                total += status.st_size
+
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= limit:
             break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
 
-        if root.tag != "program" or root[i].tag != "instruction":
-            raise XMLStructureException
-        for name in root.attrib:
-            if name != "language" and name != "name" and name != "description":
-                raise XMLStructureException
 
-        for name, value in root[i].attrib.items():
-            if name != "order" and name != "opcode":
-                raise XMLStructureException
+def loadProgram(source_file, cache_directory):
+    """ Načítanie programu zo súboru alebo štandardného vstupu s využitím vyrovnávacej pamäte
+    Ak je program v pamäti uložený pre rovnaký obsah XML a rovnakú verziu interpretu,
+    XML sa vôbec neanalyzuje. Bez adresára vyrovnávacej pamäte (--no-cache) sa volá iba sourceXml()
+    """
+    if cache_directory is None:
+        return sourceXml(source_file)
 
-        try:
-            tmp = int(tmp)
-            if tmp <= 0:
-                raise ValueError
-            lst.append(tmp)
-            if lst.count(i) > 1:
-                raise ValueError
-            if root[i].get('opcode') is None:
-                raise XMLStructureException
-        except Exception:
-            raise XMLStructureException
+    if isinstance(source_file, (str, os.PathLike)):
+        with fileExist(source_file) as stream:
+            key = programKey(stream)
+        source = source_file
+    else:
+        source = io.BytesIO(source_file.read())
+        key = programKey(source)
+        source.seek(0)
+
+    program = loadCachedProgram(cache_directory, key)
+    if program is None:
+        program = sourceXml(source)
+        storeCachedProgram(cache_directory, key, program)
+    return program
+
+
+""" ------------------------ ROZHRANIE KNIŽNICE ------------------------ """
+
+
+class Program:
+    """
+    Načítaný a skontrolovaný program, ktorý sa dá vykonať ľubovoľný počet krát.
+
+    Predspracované inštrukcie sa počas interpretácie nemenia, všetok stav interpretácie
+    (rámce, zásobníky, vstup a výstup) vytvára pri každom spustení trieda Interpreter.
+    """
+    __slots__ = ('instructions',)
+
+    def __init__(self, instructions):
+        """
+        Parametre
+        ----------
+        instructions : list
+            Pole predspracovaných inštrukcií zoradených podľa order
+        """
+        self.instructions = instructions
 
-        count_args = 1
-        operand = []
-        instruction_type = []
-        for child in list(root[i]):
-            argument, arg_num = child.tag[:3], child.tag[3:]
+    def __len__(self):
+        return len(self.instructions)
+
+
+class Result:
+    """
+    Výsledok jedného spustenia programu metódou Interpreter.run().
+
+    Parametre
+    ----------
+    exit_code : int
+        Návratová hodnota - 0, hodnota inštrukcie EXIT alebo kód chyby (tabuľka ERRORS)
+    message : str
+        Chybová hláška, None ak program neskončil chybou
+    error : type
+        Trieda výnimky z tabuľky ERRORS, ktorou program skončil (napr. TimeLimitException), inak None
+    output : str
+        Výstup programu, ak run() nedostal výstupný prúd, inak None
+    statistics : Statistics
+        Štatistiky rozšírenia STATP, None ak sa nezbierali
+    profiler : Profiler
+        Profil interpretácie, None ak sa nemeral
+    sampler : Sampler
+        Vzorkovací profil, None ak sa nevzorkovalo
+    """
+    __slots__ = ('exit_code', 'message', 'error', 'output', 'statistics', 'profiler', 'sampler')
+
+    def __init__(self, exit_code, message=None, error=None, output=None, statistics=None, profiler=None,
+                 sampler=None):
+        self.exit_code = exit_code
+        self.message = message
+        self.error = error
+        self.output = output
+        self.statistics = statistics
+        self.profiler = profiler
+        self.sampler = sampler
+
+
+class Interpreter:
+    """
+    Opakovane použiteľná interpretácia programu bez globálneho stavu.
+
+    Každé volanie run() vytvorí nové rámce, zásobníky, vstup a výstup, takže jeden program sa dá
+    v jednom procese vykonať mnohokrát, aj viacerými inštanciami naraz. Vzorkovanie
+    (sample_interval) používa signál, a preto funguje iba v hlavnom vlákne.
+    """
+    __slots__ = ('program', 'engine', 'flush', 'statistics', 'profile', 'sample_interval', 'frame_limit',
+                 'data_stack_limit', 'time_limit')
+
+    def __init__(self, program, engine="interpreted", flush="full", statistics=False, profile=False,
+                 sample_interval=None, frame_limit=FRAME_STACK_LIMIT, data_stack_limit=DATA_STACK_LIMIT,
+                 time_limit=None):
+        """
+        Parametre
+        ----------
+        program : Program
+            Program načítaný funkciou load_program()
+        engine : str
+            Spôsob vykonávania - interpreted alebo compiled
+        flush : str
+            Spôsob vyprázdňovania výstupu - line alebo full
+        statistics : bool
+            Zbierať štatistiky rozšírenia STATP (nedá sa kombinovať s engine compiled)
+        profile : bool
+            Merať profil interpretácie (nedá sa kombinovať so štatistikami ani s engine compiled)
+        sample_interval : float
+            Interval vzorkovania v milisekundách, None bez vzorkovania
+        frame_limit : int
+            Maximálna hĺbka zásobníka rámcov, nezáporná
+        data_stack_limit : int
+            Maximálny počet hodnôt na dátovom zásobníku, nezáporný
+        time_limit : float
+            Maximálny čas behu programu v sekundách (0 < time_limit <= TIME_LIMIT_MAX), None bez obmedzenia
+            (iba v hlavnom vlákne)
+        """
+        if engine not in ("interpreted", "compiled") or flush not in ("line", "full") or (statistics and profile) \
+                or (engine == "compiled" and (statistics or profile)):
+            raise ParameterException
+        if frame_limit < 0 or data_stack_limit < 0 \
+                or (time_limit is not None and not 0 < time_limit <= TIME_LIMIT_MAX):
+            raise ParameterException
+        self.program = program
+        self.engine = engine
+        self.flush = flush
+        self.statistics = statistics
+        self.profile = profile
+        self.sample_interval = sample_interval
+        self.frame_limit = frame_limit
+        self.data_stack_limit = data_stack_limit
+        self.time_limit = time_limit
+
+    def run(self, stdin=None, stdout=None, stderr=None):
+        """
+        Vykoná program a vráti výsledok (trieda Result), chyby za behu programu sa nevyhadzujú,
+        ale vrátia sa ako návratová hodnota a chybová hláška
+
+        Parametre
+        ----------
+        stdin : bytes alebo binárny súbor
+            Vstup inštrukcie READ, None je prázdny vstup
+        stdout : textový súbor
+            Výstup inštrukcie WRITE, pri None sa výstup vráti v Result.output
+        stderr : textový súbor
+            Výstup inštrukcií DPRINT a BREAK, None je štandardný chybový výstup
+        """
+        program = self.program.instructions
+        if stdin is None or isinstance(stdin, (bytes, bytearray)):
+            stdin = io.BytesIO(stdin or b"")
+        captured = io.StringIO() if stdout is None else None
+        output = OutputBuffer(captured or stdout, self.flush)
+        result = Result(0)
+        result.statistics = Statistics(program) if self.statistics else None
+        result.profiler = Profiler(program) if self.profile else None
+
+        interpretation = Interpretation(global_frame={}, local_frame=FrameStack(self.frame_limit),
+                                        temporary_frame=None, call_stack=[],
+                                        data_stack=DataStack(self.data_stack_limit), input_reader=InputReader(stdin),
+                                        output=output, error_output=stderr)
+        if self.sample_interval is not None:
+            result.sampler = Sampler(interpretation, self.sample_interval)
+            result.sampler.start()
+        if self.time_limit is not None:
+            signal.signal(signal.SIGALRM, timeLimitExceeded)
             try:
-                arg_num = int(arg_num)
-                if argument[:3] != "arg" or arg_num <= 0 or arg_num >= 4 or arg_num != count_args:
-                    raise ValueError
-            except (TypeError, ValueError):
-                raise XMLStructureException
+                signal.setitimer(signal.ITIMER_REAL, self.time_limit)
+            except (signal.ItimerError, OverflowError):
+                # Limit, ktorý platforma nevie nastaviť, je chybný parameter úlohy, nie pád interpretu
+                signal.signal(signal.SIGALRM, signal.SIG_DFL)
+                raise ParameterException
+        try:
+            try:
+                # Inštrukcie sa vykonávajú vzostupne podľa poradia order, po poslednej inštrukcii
+                # sa program ukončí s návratovou hodnotou 0, inštrukcia EXIT ukončí program skôr
+                if result.statistics is not None:
+                    interpretation.runStatistics(program, result.statistics)
+                elif result.profiler is not None:
+                    interpretation.runProfile(program, result.profiler)
+                elif self.engine == "compiled":
+                    interpretation.runCompiled(program)
+                else:
+                    interpretation.run(program)
+            finally:
+                # Výstup sa vypíše pri normálnom ukončení, pri inštrukcii EXIT aj pri chybe
+                if self.time_limit is not None:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+                if result.sampler is not None:
+                    result.sampler.stop()
+                output.flush()
+        except ExitException as exception:
+            result.exit_code = exception.args[0]
+        except tuple(ERRORS) as exception:
+            result.exit_code, result.message = errorReport(exception)
+            result.error = type(exception)
+        if result.profiler is not None:
+            result.profiler.finish()
+        if captured is not None:
+            result.output = captured.getvalue()
+        return result
+
+
+def timeLimitExceeded(signum, frame):
+    """ Obsluha signálu SIGALRM - ukončenie programu po uplynutí časového limitu
+    """
+    raise TimeLimitException
 
-            operand.append(root[i].find('arg{}'.format(count_args)).text)
-            instruction_type.append(child.get('type'))
-            count_args += 1
-        checkOpcode(root[i].get('opcode'), operand, instruction_type, lst)
-        i += 1
 
-    return root
+def load_program(source, optimize=False, cache_directory=None):
+    """
+    Načíta a skontroluje program, chyby načítania sa vyhadzujú ako výnimky (tabuľka ERRORS)
+
+    Parametre
+    ----------
+    source : str, os.PathLike, bytes alebo binárny súbor
+        Cesta k súboru s XML reprezentáciou programu, samotné XML alebo prúd, z ktorého sa XML prečíta
+    optimize : bool
+        Optimalizovať program (superinštrukcie, vynechanie návestí)
+    cache_directory : str
+        Adresár vyrovnávacej pamäte načítaných programov, None bez vyrovnávacej pamäte
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    instructions = loadProgram(source, cache_directory)
+    if optimize:
+        instructions = optimizeProgram(instructions)
+    return Program(instructions)
 
 
-def show_help():
+""" ------------------------ DÁVKOVÝ REŽIM ------------------------ """
+
+
+class JobServer:
+    """
+    Dávkový režim (parameter --serve) - jeden proces interpretu vykoná mnoho úloh za sebou.
+
+    Každá úloha je jeden riadok JSON so zdrojovým programom, vstupom a voliteľnými limitmi,
+    odpoveďou je jeden riadok JSON s výstupom, chybovým výstupom, návratovou hodnotou a časmi.
+    Načítané programy sa pamätajú podľa odtlačku XML, takže opakovaná úloha s rovnakým programom
+    XML znova neanalyzuje. Každá úloha beží vo vlastnej inštancii triedy Interpreter.
+    """
+    __slots__ = ('programs', 'cache_directory', 'engine', 'optimize', 'size')
+
+    def __init__(self, cache_directory=None, engine="interpreted", optimize=False, size=SERVE_PROGRAM_CACHE):
+        """
+        Parametre
+        ----------
+        cache_directory : str
+            Adresár vyrovnávacej pamäte načítaných programov na disku, None bez nej
+        engine : str
+            Predvolený spôsob vykonávania úloh - interpreted alebo compiled
+        optimize : bool
+            Predvolene optimalizovať programy
+        size : int
+            Počet načítaných programov, ktoré sa pamätajú medzi úlohami
+        """
+        self.programs = {}
+        self.cache_directory = cache_directory
+        self.engine = engine
+        self.optimize = optimize
+        self.size = size
+
+    @staticmethod
+    def checkJob(job):
+        """ Kontrola polí úlohy, chybná úloha vyhodí ParameterException
+        Neznáme pole alebo limit (napr. preklep v názve) je chyba, nie tichý beh bez limitu
+        """
+        for field, value in job.items():
+            if field != "id" and (field not in SERVE_JOB_FIELDS or not isinstance(value, SERVE_JOB_FIELDS[field])):
+                raise ParameterException
+        if not all(isinstance(item, str) for item in job.get("stats", [])):
+            raise ParameterException
+        for limit, value in job.get("limits", {}).items():
+            if limit not in SERVE_JOB_LIMITS or not isinstance(value, SERVE_JOB_LIMITS[limit]) \
+                    or isinstance(value, bool):
+                raise ParameterException
+            # Časový limit musí byť kladný a konečný (NaN neprejde porovnaním), ostatné nezáporné
+            if not (0 < value <= TIME_LIMIT_MAX if limit == "time" else value >= 0):
+                raise ParameterException
+
+    def program(self, job, optimize):
+        """ Načítaný program úlohy a príznak, či bol už v pamäti
+        Program je zadaný cestou k súboru (source) alebo priamo textom XML (xml)
+        """
+        if "xml" in job:
+            xml = job["xml"].encode()
+        elif "source" in job:
+            with fileExist(job["source"]) as stream:
+                xml = stream.read()
+        else:
+            raise ParameterException
+        key = (hashlib.sha256(xml).digest(), optimize)
+        program = self.programs.pop(key, None)
+        cached = program is not None
+        if program is None:
+            program = load_program(xml, optimize, self.cache_directory)
+            while len(self.programs) >= self.size:
+                del self.programs[next(iter(self.programs))]
+        # Naposledy použitý program sa presunie na koniec slovníka, zo začiatku sa odstraňujú najstaršie
+        self.programs[key] = program
+        return program, cached
+
+    def execute(self, job):
+        """ Vykonanie jednej úlohy, vráti odpoveď ako slovník
+        """
+        response = {"id": job.get("id"), "exit_code": 0, "stdout": "", "stderr": "", "cached": False,
+                     "load_ms": 0.0, "run_ms": 0.0}
+        started = time.perf_counter()
+        try:
+            self.checkJob(job)
+            program, response["cached"] = self.program(job, bool(job.get("optimize", self.optimize)))
+            loaded = time.perf_counter()
+            response["load_ms"] = round((loaded - started) * 1000, 3)
+
+            limits = job.get("limits", {})
+            statistics = job.get("stats", [])
+            if not all(item in ("insts", "hot", "vars") for item in statistics):
+                raise ParameterException
+            interpreter = Interpreter(program, engine=job.get("engine", self.engine), statistics=bool(statistics),
+                                      frame_limit=limits.get("frames", FRAME_STACK_LIMIT),
+                                      data_stack_limit=limits.get("data_stack", DATA_STACK_LIMIT),
+                                      time_limit=limits.get("time"))
+            if "input_file" in job:
+                with fileExist(job["input_file"]) as stdin:
+                    data = stdin.read()
+            else:
+                data = job.get("input", "").encode()
+            errors = io.StringIO()
+            result = interpreter.run(data, stderr=errors)
+            response["run_ms"] = round((time.perf_counter() - loaded) * 1000, 3)
+
+            response["exit_code"] = result.exit_code
+            response["stdout"] = result.output
+            response["stderr"] = errors.getvalue()
+            if result.message is not None:
+                response["stderr"] += result.message + "\n"
+            if result.statistics is not None:
+                response["stats"] = {item: statisticsValue(result.statistics, item, program.instructions)
+                                     for item in statistics}
+        except tuple(ERRORS) as exception:
+            response["exit_code"], message = errorReport(exception)
+            if message is not None:
+                response["stderr"] += message + "\n"
+        return response
+
+    def serve(self, reader, writer):
+        """ Spracovanie úloh z textového prúdu, na každú úlohu sa hneď zapíše odpoveď
+        Chybná úloha (neplatný JSON alebo parametre) dostane návratovú hodnotu 10
+        """
+        for line in reader:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError:
+                job = None
+            if isinstance(job, dict):
+                response = self.execute(job)
+            else:
+                code, message = ERRORS[ParameterException]
+                response = {"id": None, "exit_code": code, "stdout": "", "stderr": message + "\n"}
+            writer.write(json.dumps(response) + "\n")
+            writer.flush()
+        return 0
+
+
+def serveSocket(server, path):
+    """ Dávkový režim na lokálnom soketi - spojenia sa spracúvajú postupne, každé posiela úlohy
+    ako riadky JSON. Server beží do prerušenia (SIGINT), potom soket odstráni
+    """
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(path)
+        listener.listen()
+    except OSError:
+        listener.close()
+        raise FileOutputException
+    try:
+        while True:
+            connection, _ = listener.accept()
+            with connection, connection.makefile("r") as reader, connection.makefile("w") as writer:
+                try:
+                    server.serve(reader, writer)
+                except OSError:
+                    # Klient ukončil spojenie skôr, ako dostal všetky odpovede
+                    pass
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+def show_help(argv):
     """ Funkcia vypíše nápovedu na štandardný výstup
     Vyhodí chybu, ak je parameter --help zadaný s iným parametrom
     """
-    if len(sys.argv) != 2:
+    if len(argv) != 1:
         raise ParameterException
 
-    print("""Použitie: python3.8 interpret.py [--help] [--source=file] [--input=file]\n
+    print("""Použitie: python3.8 interpret.py [--help] [--source=file] [--input=file] [--output=file]
+                                [--flush=line|full] [--optimize] [--engine=interpreted|compiled]
+                                [--no-cache] [--stats=file [--insts] [--hot] [--vars]] [--profile=file]
+                                [--sample=file [--sample-interval=ms]] [--serve[=socket]]\n
 Program načíta XML reprezentáciu programu a tento program s využitím vstupu
 podľa parametrov príkazového riadka interpretuje a generuje výstup\n
 Parametre príkazového riadka:
   --help\t vypíše túto nápovedu
   --source=file\t vstupný súbor s XML reprezentáciou zdrojového kódu
-  --input=file\t súbor so vstupmi pre samotnú interpretáciu zadaného zdrojového kódu\n""")
+  --input=file\t súbor so vstupmi pre samotnú interpretáciu zadaného zdrojového kódu
+  --output=file\t súbor, do ktorého sa zapíše výstup programu (predvolene štandardný výstup)
+  --flush=line\t výstup sa vypíše po každom konci riadka
+  --flush=full\t výstup sa vypíše až po naplnení vyrovnávacej pamäte (predvolené)
+  --optimize\t pred interpretáciou optimalizuje program (superinštrukcie, vynechanie návestí)
+  --engine=interpreted\t každá inštrukcia sa vykoná metódou triedy Interpretation (predvolené)
+  --engine=compiled\t základné bloky programu sa pred vykonaním preložia na funkcie v Pythone
+  --no-cache\t program sa vždy načíta z XML, bez použitia vyrovnávacej pamäte načítaných programov
+  --stats=file\t súbor, do ktorého sa po skončení interpretácie zapíšu štatistiky (rozšírenie STATP)
+  --insts\t počet vykonaných inštrukcií (okrem LABEL, DPRINT a BREAK)
+  --hot\t\t hodnota order najčastejšie vykonanej inštrukcie
+  --vars\t maximálny počet inicializovaných premenných vo všetkých platných rámcoch naraz
+  --profile=file\t profil interpretácie (počty a časy inštrukcií, operačných kódov a funkcií) sa zapíše
+\t\t do súboru file ako text a do súboru file.json vo formáte JSON, nedá sa kombinovať s --stats
+  --sample=file\t vzorkovací profil (zásobník volaní CALL a práve vykonávaná inštrukcia) sa zapíše
+\t\t do súboru file vo formáte collapsed stack pre flamegraph
+  --sample-interval=ms\t interval vzorkovania v milisekundách procesorového času (predvolene 5)
+  --serve\t dávkový režim - úlohy vo formáte JSON sa čítajú po riadkoch zo štandardného vstupu
+\t\t a odpovede sa zapisujú na štandardný výstup
+  --serve=socket\t dávkový režim na lokálnom (Unix) sokete socket\n""")
+
+
+def main(argv=None):
+    """ Hlavná časť programu - spracovanie parametrov príkazového riadka, načítanie a interpretácia
+    programu, vráti návratovú hodnotu interpretu
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    try:
+        return runCommandLine(argv)
+    except tuple(ERRORS) as exception:
+        code, message = errorReport(exception)
+        if message is not None:
+            print(message, file=sys.stderr)
+        return code
 
 
-try:
-    """ Hlavná časť programu
-    
-    Analyzuje parametry s ktorými môže skript pracovať
+def runCommandLine(argv):
+    """ Analyzuje parametre, s ktorými môže skript pracovať, a vykoná program
     """
-    if len(sys.argv) < 2 or len(sys.argv) > 3:
+    if len(argv) < 1:
         raise ParameterException
 
-    if sys.argv[1] == "--help" or sys.argv[1] == "-h":
-        show_help()
-        exit(0)
+    if argv[0] == "--help" or argv[0] == "-h":
+        show_help(argv)
+        return 0
 
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(allow_abbrev=False)
     parser.add_argument("--source", nargs='?')
     parser.add_argument("--input", nargs='?')
+    parser.add_argument("--output", nargs='?')
+    parser.add_argument("--flush", choices=("line", "full"), default="full")
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--engine", choices=("interpreted", "compiled"), default="interpreted")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--stats", nargs='?')
+    parser.add_argument("--insts", dest="statistics", action="append_const", const="insts", default=[])
+    parser.add_argument("--hot", dest="statistics", action="append_const", const="hot")
+    parser.add_argument("--vars", dest="statistics", action="append_const", const="vars")
+    parser.add_argument("--profile")
+    parser.add_argument("--sample")
+    parser.add_argument("--sample-interval", type=float)
+    parser.add_argument("--serve", nargs='?', const="")
 
     try:
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
     except SystemExit as ex:
         if ex.code == 0:
-            exit(0)
+            return 0
         else:
             raise ParameterException()
 
-    input_none = False
+    cache_directory = None if args.no_cache else os.environ.get("IPP_CACHE_DIR") or CACHE_DIRECTORY
+    if args.serve is not None:
+        if any(option is not None for option in (args.source, args.input, args.output, args.stats, args.profile,
+                                                 args.sample, args.sample_interval)) or args.statistics:
+            raise ParameterException
+        server = JobServer(cache_directory, engine=args.engine, optimize=args.optimize)
+        if not args.serve:
+            return server.serve(sys.stdin, sys.stdout)
+        return serveSocket(server, args.serve)
+
+    if args.source is None and args.input is None:
+        raise ParameterException
 
-    if args.source is None:
-        try:
-            root = ElementTree.parse(sys.stdin)
-            root.getroot()
-            root.find('.')
-            root.findall("*")
-        except ElementTree.ParseError:
-            raise XMLFormatException
-        exit(0)
-    else:
-        sourceFile = args.source
-        root = sourceXml(sourceFile)
+    if args.statistics and args.stats is None:
+        raise ParameterException
+
+    if args.stats is not None and args.profile is not None:
+        raise ParameterException
+
+    # Štatistiky a profil zbierajú vlastné cykly po inštrukciách, preložené bloky ich nepoznajú
+    if args.engine == "compiled" and (args.stats is not None or args.profile is not None):
+        raise ParameterException
+
+    if args.sample_interval is not None and (args.sample is None or not args.sample_interval > 0):
+        raise ParameterException
+
+    if args.sample is not None and not hasattr(signal, "setitimer"):
+        raise ParameterException
+
+    program = load_program(sys.stdin.buffer if args.source is None else args.source, args.optimize,
+                           cache_directory)
 
     if args.input is not None:
-        my_stdin = sys.stdin
-        sys.stdin = open(args.input)
-
-    # Inicializácia triedy Interpretation
-    interpretClass = Interpretation(global_frame=[], gf_ind=0, local_frame=None, lf_ind=0,
-                                    temporary_frame=None, call_stack=[], data_stack=[])
-    i = 0
-    while True:
-        """ Cyklus postupne spracováva inštrukcie vzostupne podľa poradia order
-        
-        Hodnota i sa navyšuje každou iteráciou o 1
-        Ak je spracovávaná inštrukcia JUMP, JUMPIFEQ, JUMPIFNEQ, CALL, RETURN JUMPIFEQS alebo JUMPIFNEQS,
-        hodnota i sa rovná návratovej hodnote z týchto metód triedy Interpretation
-        Ak už neexistuje inštrukcia, ktorá by sa mohla spracovať, cyklus sa ukončí
-        a program sa ukončí s návratovou hodnotou 0
-        """
+        input_stream = fileExist(args.input)
+    else:
+        input_stream = sys.stdin.buffer
+
+    if args.output is not None:
         try:
-            opcode = root[i].attrib['opcode'].upper()
-            if opcode == "JUMP" or opcode == "JUMPIFEQ" or \
-                    opcode == "JUMPIFNEQ" or opcode == "CALL" or opcode == "RETURN" or \
-                    opcode == "JUMPIFEQS" or opcode == "JUMPIFNEQS":
-                i = interpretClass.switch(root[i].attrib['opcode'], root, root[i].attrib['order'])
-            else:
-                interpretClass.switch(root[i].attrib['opcode'], root, root[i].attrib['order'])
-                i += 1
-        except:
-            break
-    exit(0)
-
-
-# ----------------------- Chybové návratové hodnoty -----------------------
-
-
-except ParameterException:
-    print("Zlé parametre!", file=sys.stderr)
-    sys.exit(10)
-except FileInputException:
-    exit(11)
-except XMLFormatException:
-    print("Chybný XML formát vo vstupnom súbore!", file=sys.stderr)
-    exit(31)
-except XMLStructureException:
-    print("Zlá štruktúra XML!", file=sys.stderr)
-    exit(32)
-
-except SemanticException:
-    print("Chybná sémantika!", file=sys.stderr)
-    exit(52)
-except OperandTypeException:
-    print("Chybný typ operandu!", file=sys.stderr)
-    exit(53)
-except UndeclaredVariableException:
-    print("Premenná neexistuje!", file=sys.stderr)
-    exit(54)
-except UndeclaredFrameException:
-    print("Rámec neexistuje!", file=sys.stderr)
-    exit(55)
-except MissingValueException:
-    print("Chýbajúca hodnota!", file=sys.stderr)
-    exit(56)
-except ValueOperandException:
-    print("Chybná hodnota operandu!", file=sys.stderr)
-    exit(57)
-except StringOperationException:
-    print("Chybná práca s reťazcom!", file=sys.stderr)
-    exit(58)
+            output_stream = open(args.output, "w")
+        except OSError:
+            raise FileOutputException
+    else:
+        output_stream = sys.stdout
+
+    # Súbory so štatistikami a profilmi sa otvoria ešte pred interpretáciou
+    try:
+        stats_stream = open(args.stats, "w") if args.stats is not None else None
+        profile_streams = (open(args.profile, "w"), open(args.profile + ".json", "w")) \
+            if args.profile is not None else None
+        sample_stream = open(args.sample, "w") if args.sample is not None else None
+    except OSError:
+        raise FileOutputException
+
+    interpreter = Interpreter(program, engine=args.engine, flush=args.flush, statistics=stats_stream is not None,
+                              profile=profile_streams is not None,
+                              sample_interval=(args.sample_interval or SAMPLE_INTERVAL) if sample_stream else None)
+    result = interpreter.run(input_stream, output_stream)
+
+    # Štatistiky a profily sa zapíšu pri normálnom ukončení, pri inštrukcii EXIT aj pri chybe
+    if result.statistics is not None:
+        writeStatistics(stats_stream, args.statistics, result.statistics, program.instructions)
+    if result.profiler is not None:
+        writeProfile(*profile_streams, result.profiler, program.instructions)
+    if result.sampler is not None:
+        writeSamples(sample_stream, result.sampler, program.instructions)
+
+    if result.message is not None:
+        print(result.message, file=sys.stderr)
+    return result.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,456 @@
+#!/usr/bin/python3
+
+# =============================================================================================
+# Súbor: test.py
+# Jazyk: Python 3.8
+# Opis: Paralelné automatické testovanie skriptov parse.php a interpret.py. Skript prechádza zadaný
+#       adresár s testami (.src, .in, .out, .rc, voliteľne .stats), testy spúšťa v skupine procesov,
+#       výstupy porovnáva v pamäti a vypíše rovnaký súhrn v HTML 5 ako test.php, voliteľne aj
+#       výsledky vo formáte JSON a JUnit XML.
+# Autor: Peter Koprda (xkoprd00)
+# =============================================================================================
+
+import argparse
+import concurrent.futures
+import glob
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from html import escape
+
+import xmlcompare
+
+# Návratové kódy programu
+OK_COMPILATION = 0
+WRONG_PAR_ERR = 10
+INPUT_FILE_ERR = 11
+FILE_OPEN_ERR = 12
+
+# Predvolený časový limit jedného testu v sekundách
+TIMEOUT = 10.0
+
+# Štatistiky rozšírenia STATP v poradí riadkov súboru .stats, s ktorým sa porovnajú
+STATISTICS_ITEMS = ("insts", "hot", "vars")
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang = "en-US">
+<head>
+<meta charset = "UTF-8">
+<title>test.py</title>
+</head>
+<body>
+"""
+
+HTML_TABLE = """<style type="text/css">
+    .tg  {border-collapse:collapse;border-spacing:0;}
+    .tg td{font-family:Arial, sans-serif;font-size:14px;padding:5px 20px;border-style:solid;border-width:1px;overflow:hidden;word-break:normal;border-color:black;}
+    .tg th{font-family:Arial, sans-serif;font-size:14px;font-weight:normal;padding:5px 15px;border-style:solid;border-width:1px;overflow:hidden;word-break:normal;border-color:black;}
+    .tg .tg-cly1{text-align:center;vertical-align:middle}
+    .tg .tg-gb0u{background-color:#34ff34;text-align:center;vertical-align:middle}
+    .tg .tg-g30i{background-color:#fe0000;text-align:center;vertical-align:middle}
+    </style>
+    <table class="tg">
+    <tr>
+<th class="tg-cly1"><b>Test</b></th>
+<th class="tg-cly1"><b>Status</b></th>
+</tr>
+"""
+
+# Interpret načítaný v procese (parameter --in-process), nastaví ho inicializácia procesu
+interpreter_module = None
+
+
+class TestCase:
+    """
+    Jeden test - zdrojový súbor .src a k nemu prislúchajúce súbory .in, .out a .rc, voliteľne
+    aj súbor .stats s očakávanými štatistikami STATP (--insts, --hot, --vars po riadkoch).
+
+    Parametre
+    ----------
+    source : str
+        Cesta k súboru .src
+    name : str
+        Názov testu (názov súboru bez prípony)
+    """
+    __slots__ = ('source', 'name', 'input', 'output', 'rc', 'statistics')
+
+    def __init__(self, source):
+        base = source[:-len(".src")]
+        self.source = source
+        self.name = os.path.basename(base)
+        self.input = base + ".in"
+        self.output = base + ".out"
+        self.rc = base + ".rc"
+        self.statistics = base + ".stats"
+
+
+class TestResult:
+    """
+    Výsledok jedného testu.
+
+    Parametre
+    ----------
+    status : str
+        OK, FAILED alebo TIMEOUT
+    expected_rc : int
+        Očakávaná návratová hodnota zo súboru .rc
+    rc : int
+        Skutočná návratová hodnota, None pri prekročení časového limitu alebo pri výnimke interpretu
+    elapsed : float
+        Čas behu testu v sekundách
+    reason : str
+        Dôvod neúspechu, prázdny reťazec pri úspešnom teste
+    """
+    __slots__ = ('status', 'expected_rc', 'rc', 'elapsed', 'reason')
+
+    def __init__(self, status, expected_rc, rc, elapsed, reason=""):
+        self.status = status
+        self.expected_rc = expected_rc
+        self.rc = rc
+        self.elapsed = elapsed
+        self.reason = reason
+
+
+def create_files(files_src):
+    """ Vytvorenie chýbajúcich súborov .in, .out (prázdne) a .rc (s hodnotou 0)
+    """
+    tests = []
+    for source in files_src:
+        test = TestCase(source)
+        try:
+            for path, content in ((test.input, ""), (test.output, ""), (test.rc, "0")):
+                if not os.path.exists(path):
+                    with open(path, "w") as stream:
+                        stream.write(content)
+                elif not os.access(path, os.R_OK):
+                    raise OSError
+        except OSError:
+            print("Súbor sa nedá otvoriť!", file=sys.stderr)
+            sys.exit(FILE_OPEN_ERR)
+        tests.append(test)
+    return tests
+
+
+def discover(directory, recursive):
+    """ Vyhľadanie testov (súborov .src) v adresári, s parametrom --recursive aj v podadresároch
+    """
+    if not os.path.isdir(directory):
+        print("Directory " + directory + " does not exist!", file=sys.stderr)
+        sys.exit(INPUT_FILE_ERR)
+    if recursive:
+        files_src = [os.path.join(root, name) for root, _, names in os.walk(directory)
+                     for name in names if name.endswith(".src")]
+    else:
+        files_src = glob.glob(os.path.join(directory, "*.src"))
+    return create_files(sorted(files_src))
+
+
+def readFile(path, mode="rb"):
+    """ Obsah súboru testu
+    """
+    with open(path, mode) as stream:
+        return stream.read()
+
+
+""" ------------------------ SPÚŠŤANIE TESTOV ------------------------ """
+
+
+def initWorker(interpret_file):
+    """ Inicializácia procesu zo skupiny procesov - s parametrom --in-process sa interpret načíta
+    ako modul raz pre každý proces
+    """
+    global interpreter_module
+    if interpret_file is not None:
+        spec = importlib.util.spec_from_file_location("interpret", interpret_file)
+        interpreter_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(interpreter_module)
+
+
+def runProcess(command, stdin, timeout):
+    """ Spustenie skriptu - návratová hodnota a štandardný výstup, None pri prekročení časového limitu
+    """
+    try:
+        completed = subprocess.run(command, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, b""
+    return completed.returncode, completed.stdout
+
+
+def interpret(options, xml, data, timeout, statistics=False):
+    """ Interpretácia XML - v novom procese skriptu interpret.py alebo v procese testu (--in-process)
+    Vráti návratovú hodnotu, výstup a pri statistics aj text štatistík STATP, inak None. Štatistiky
+    sa zbierajú bez parametra --engine, s ktorým sa nedajú kombinovať
+    """
+    engine = "interpreted" if statistics else options.engine
+    if interpreter_module is None:
+        with tempfile.NamedTemporaryFile(suffix=".xml") as source, \
+                tempfile.NamedTemporaryFile("r", suffix=".stats") as stats:
+            source.write(xml)
+            source.flush()
+            command = [sys.executable, options.int_script, "--source=" + source.name, "--no-cache",
+                       "--engine=" + engine]
+            if options.optimize:
+                command.append("--optimize")
+            if statistics:
+                command += ["--stats=" + stats.name] + ["--" + item for item in STATISTICS_ITEMS]
+            rc, output = runProcess(command, data, timeout)
+            return rc, output, stats.read() if statistics else None
+
+    module = interpreter_module
+    try:
+        program = module.load_program(xml, optimize=options.optimize)
+    except tuple(module.ERRORS) as exception:
+        return module.ERRORS[type(exception)][0], b"", "" if statistics else None
+    result = module.Interpreter(program, engine=engine, statistics=statistics,
+                                time_limit=timeout).run(data, stderr=io.StringIO())
+    if result.error is module.TimeLimitException:
+        return None, b"", None
+    counted = None
+    if statistics:
+        counted = "".join("%s\n" % module.statisticsValue(result.statistics, item, program.instructions)
+                          for item in STATISTICS_ITEMS)
+    return result.exit_code, result.output.encode(), counted
+
+
+def compareXml(options, output, expected):
+    """ Porovnanie výstupu parse.php s očakávaným XML, vráti zoznam rozdielov
+    Predvolene porovnáva modul xmlcompare v procese testu, nástroj JExamXML sa spustí iba
+    s parametrom --jexamxml
+    """
+    if options.jexamxml is None:
+        return xmlcompare.compare(output, expected, options.compare_options)
+
+    with tempfile.TemporaryDirectory() as directory:
+        actual = os.path.join(directory, "output.xml")
+        with open(actual, "wb") as stream:
+            stream.write(output)
+        command = ["java", "-jar", options.jexamxml, actual, expected, os.path.join(directory, "delta.xml")]
+        if os.path.exists(xmlcompare.OPTIONS_FILE):
+            command += ["/D", xmlcompare.OPTIONS_FILE]
+        if subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+            return []
+        return ["výstup XML sa líši (JExamXML)"]
+
+
+def runTest(options, test):
+    """ Vykonanie jedného testu podľa režimu (--parse-only, --int-only alebo oba skripty)
+    """
+    started = time.perf_counter()
+    expected_rc = int(readFile(test.rc, "r").strip() or 0)
+    data = readFile(test.input)
+    source = readFile(test.source)
+
+    def result(rc, passed, reason=""):
+        elapsed = time.perf_counter() - started
+        if rc is None:
+            return TestResult("TIMEOUT", expected_rc, None, elapsed, "časový limit %.1f s" % options.timeout)
+        return TestResult("OK" if passed else "FAILED", expected_rc, rc, elapsed, "" if passed else reason)
+
+    if not options.int_only:
+        rc, xml = runProcess(["php", options.parse_script], source, options.timeout)
+        if rc != 0 or options.parse_only:
+            if rc != expected_rc:
+                return result(rc, False, "návratová hodnota %s, očakávaná %d" % (rc, expected_rc))
+            if rc != 0:
+                return result(rc, True)
+            differences = compareXml(options, xml, test.output)
+            return result(rc, not differences, differences[0] if differences else "")
+        source = xml
+
+    statistics = os.path.exists(test.statistics)
+    try:
+        rc, output, counted = interpret(options, source, data, options.timeout, statistics)
+    except Exception as exception:
+        # Výnimka mimo tabuľky ERRORS (chyba v interprete pri --in-process) zlyhá iba tento test
+        return TestResult("FAILED", expected_rc, None, time.perf_counter() - started,
+                          "výnimka %s: %s" % (type(exception).__name__, exception))
+    if rc != expected_rc:
+        return result(rc, False, "návratová hodnota %s, očakávaná %d" % (rc, expected_rc))
+    # Štatistiky sa zapíšu aj pri chybe, preto sa porovnávajú pred kontrolou návratovej hodnoty 0
+    if statistics and counted != readFile(test.statistics, "r"):
+        return result(rc, False, "štatistiky sa líšia")
+    if rc != 0:
+        return result(rc, True)
+    return result(rc, output == readFile(test.output), "výstup sa líši")
+
+
+""" ------------------------ VÝSLEDKY TESTOV ------------------------ """
+
+
+def writeHtml(options, tests, results, stream):
+    """ Súhrn v HTML 5 v rovnakom tvare ako výstup test.php
+    """
+    stream.write(HTML_HEAD)
+    stream.write(HTML_TABLE)
+    if options.parse_only:
+        stream.write("<h1>Testing parse.php</h1>")
+    elif options.int_only:
+        stream.write("<h1>Testing interpret.py</h1>")
+    else:
+        stream.write("<h1>Testing parse.php and interpret.py</h1>")
+
+    passed = 0
+    for test, result in zip(tests, results):
+        status_class = "tg-gb0u" if result.status == "OK" else "tg-g30i"
+        status = "OK" if result.status == "OK" else "FAILED"
+        stream.write("<tr>\n<th class=\"tg-cly1\">%s</th>\n<th class=\"%s\">%s</th>\n</tr>\n"
+                     % (escape(test.name), status_class, status))
+        passed += result.status == "OK"
+    stream.write("</table>\n\n    </section>\n")
+
+    total = len(results)
+    if total == 0:
+        stream.write("<h2>No tests found!</h2>\n")
+    else:
+        stream.write("<h2>Total tests: %d</h2>\n\n    <h2>Passed: %d</h2>\n\n    <h2>Failed: %d</h2>\n"
+                     % (total, passed, total - passed))
+        if passed == total:
+            stream.write("<h2>All tests passed!</h2>\n")
+        else:
+            stream.write("<h2>Passed test cases percentage: %s%%</h2>\n" % round(passed / total * 100, 2))
+    stream.write("</body>\n</html>\n")
+
+
+def writeJson(tests, results, path):
+    """ Výsledky testov vo formáte JSON
+    """
+    passed = sum(result.status == "OK" for result in results)
+    report = {
+        "total": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "tests": [{"name": test.name, "source": test.source, "status": result.status,
+                   "expected_rc": result.expected_rc, "rc": result.rc, "time_s": round(result.elapsed, 6),
+                   "reason": result.reason}
+                  for test, result in zip(tests, results)],
+    }
+    with open(path, "w") as stream:
+        json.dump(report, stream, indent=1)
+
+
+def writeJunit(tests, results, path):
+    """ Výsledky testov vo formáte JUnit XML
+    """
+    failures = sum(result.status == "FAILED" for result in results)
+    errors = sum(result.status == "TIMEOUT" for result in results)
+    suite = ElementTree.Element("testsuite", name="ippcode20", tests=str(len(results)), failures=str(failures),
+                                errors=str(errors), time="%.6f" % sum(result.elapsed for result in results))
+    for test, result in zip(tests, results):
+        case = ElementTree.SubElement(suite, "testcase", classname=os.path.dirname(test.source) or ".",
+                                      name=test.name, time="%.6f" % result.elapsed)
+        if result.status == "FAILED":
+            ElementTree.SubElement(case, "failure", message=result.reason)
+        elif result.status == "TIMEOUT":
+            ElementTree.SubElement(case, "error", message=result.reason)
+    ElementTree.ElementTree(suite).write(path, encoding="UTF-8", xml_declaration=True)
+
+
+def help(argv):
+    """ Funkcia na vypísanie nápovedy na štandardný výstup
+    Ak je s parametrom --help zadaný iný parameter, program sa ukončí s návratovou hodnotou 10
+    """
+    if len(argv) != 2:
+        print("Zlé parametre!", file=sys.stderr)
+        sys.exit(WRONG_PAR_ERR)
+    print("""
+Skript slúži pre automatické testovanie postupnej aplikácie parse.php a interpret.py.
+Testy spúšťa paralelne, výstupy porovnáva v pamäti a vygeneruje prehľadný súhrn v HTML 5
+do štandardného výstupu, voliteľne aj výsledky vo formáte JSON a JUnit XML.
+
+Použitie: python3.8 test.py [--help] [--directory=path] [--recursive] [--parse-script=file] [--int-script=file]
+                            [--parse-only] [--int-only] [--jexamxml=file] [--jobs=N] [--timeout=s]
+                            [--in-process] [--engine=interpreted|compiled] [--optimize] [--json=file]
+                            [--junit=file]
+
+  --help\t\tvypíše túto nápovedu
+  --directory=path\ttesty hľadá v zadanom adresári
+  --recursive\t\ttesty hľadá nielen v zadanom adresári, ale aj rekurzivne vo všetkých jeho podadresároch
+  --parse-script=file\tsúbor so skriptom v PHP 7.4 pre analýzu zdrojového kódu v IPPcode20
+  --int-script=file\tsúbor so skriptom v Python 3.8 pre interpret XML reprezentácie kódu v IPPcode20
+  --parse-only\t\tbude testovaný iba skript pre analýzu zdrojového kódu v IPPcode20
+  --int-only\t\tbude testovaný iba skript pre interpret XML reprezentácie kódu v IPPcode20
+  --jexamxml=file\tsúbor s JAR balíčkom s nástrojom A7Soft JExamXML, bez neho sa XML porovnáva
+\t\t\tv procese modulom xmlcompare.py s nastaveniami zo súboru options
+  --jobs=N\t\tpočet paralelne spustených testov (predvolene počet jadier)
+  --timeout=s\t\tčasový limit jedného testu v sekundách (predvolene 10)
+  --in-process\t\tinterpret sa načíta ako modul a programy vykonáva bez spúšťania nového procesu
+  --engine=name\t\tspôsob vykonávania programu v interprete (interpreted alebo compiled), testy
+\t\t\tso súborom .stats (štatistiky --insts, --hot a --vars) sa vykonajú vždy interpretovane
+  --optimize\t\tinterpret pred vykonaním optimalizuje program (superinštrukcie)
+  --json=file\t\tvýsledky testov sa zapíšu do súboru vo formáte JSON
+  --junit=file\t\tvýsledky testov sa zapíšu do súboru vo formáte JUnit XML
+""")
+    sys.exit(OK_COMPILATION)
+
+
+def main():
+    """ Hlavná časť programu - spracovanie parametrov, paralelné spustenie testov a výpis výsledkov
+    """
+    if len(sys.argv) > 1 and sys.argv[1] in ("--help", "-h"):
+        help(sys.argv)
+
+    parser = argparse.ArgumentParser(allow_abbrev=False, add_help=False)
+    parser.add_argument("--directory", default=os.getcwd())
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--parse-script", default="parse.php")
+    parser.add_argument("--int-script", default="interpret.py")
+    parser.add_argument("--parse-only", action="store_true")
+    parser.add_argument("--int-only", action="store_true")
+    parser.add_argument("--jexamxml")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--engine", choices=("interpreted", "compiled"), default="interpreted")
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--json")
+    parser.add_argument("--junit")
+    try:
+        options = parser.parse_args()
+    except SystemExit:
+        print("Zlé parametre!", file=sys.stderr)
+        sys.exit(WRONG_PAR_ERR)
+
+    if options.parse_only and (options.int_only or options.in_process or options.optimize
+                               or options.engine != "interpreted") or options.jobs < 1 or options.timeout <= 0:
+        print("Zlé parametre!", file=sys.stderr)
+        sys.exit(WRONG_PAR_ERR)
+    options.compare_options = xmlcompare.loadOptions()
+
+    required = []
+    if not options.int_only:
+        required.append(options.parse_script)
+    if not options.parse_only:
+        required.append(options.int_script)
+    elif options.jexamxml is not None:
+        required.append(options.jexamxml)
+    for path in required:
+        if not os.path.exists(path):
+            print("Súbor " + path + " neexistuje!", file=sys.stderr)
+            sys.exit(INPUT_FILE_ERR)
+
+    tests = discover(options.directory, options.recursive)
+    worker = os.path.abspath(options.int_script) if options.in_process else None
+    with concurrent.futures.ProcessPoolExecutor(max_workers=options.jobs, initializer=initWorker,
+                                                initargs=(worker,)) as executor:
+        results = list(executor.map(runTest, [options] * len(tests), tests))
+
+    writeHtml(options, tests, results, sys.stdout)
+    try:
+        if options.json is not None:
+            writeJson(tests, results, options.json)
+        if options.junit is not None:
+            writeJunit(tests, results, options.junit)
+    except OSError:
+        print("Súbor sa nedá otvoriť!", file=sys.stderr)
+        sys.exit(FILE_OPEN_ERR)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/python3
+
+# =============================================================================================
+# Súbor: xmlcompare.py
+# Jazyk: Python 3.8
+# Opis: Porovnanie dvoch XML dokumentov podľa nastavení nástroja A7Soft JExamXML (súbor options)
+#       bez spúšťania Javy. Dokumenty sa čítajú prúdovo, každý element sa po načítaní prevedie
+#       na kanonický tvar aj s potomkami a uvoľní, takže v pamäti sú naraz iba elementy na ceste
+#       od koreňa a kanonické tvary ich už uzavretých potomkov.
+# Autor: Peter Koprda (xkoprd00)
+# =============================================================================================
+
+import collections
+import io
+import itertools
+import os
+import sys
+import xml.etree.ElementTree as ElementTree
+
+# Návratové kódy programu - zhodné dokumenty, rozdielne dokumenty, chybné parametre alebo súbory
+XML_EQUAL = 0
+XML_DIFFERENT = 1
+XML_ERROR = 2
+
+# Maximálny počet vypísaných rozdielov
+DIFFERENCE_LIMIT = 20
+
+# Predvolený súbor s nastaveniami porovnania
+OPTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "options")
+
+# Dvojice dokumentov s očakávanými výsledkami porovnania (súbor results)
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "xmlcompare")
+
+
+class CompareOptions:
+    """
+    Nastavenia porovnania zo súboru options nástroja JExamXML.
+
+    Parametre
+    ----------
+    compare_level : int
+        0 - potomkovia každého elementu sa porovnávajú v poradí, 1 až 3 - bez ohľadu na poradie
+    case_sensitive : bool
+        Rozlišovať veľké a malé písmená v názvoch aj hodnotách
+    ignore_whitespaces : bool
+        Ignorovať biele znaky na začiatku a konci textu a viacnásobné biele znaky v texte
+    ignore_attributes : bool
+        Ignorovať atribúty elementov
+    ignore_values : bool
+        Ignorovať textový obsah elementov
+    ignore_elements : list
+        Ignorované elementy aj s podstromom - cesta od koreňa oddelená znakom >, samotný názov
+        elementu JExamXML 1.01 nerozpozná
+    """
+    __slots__ = ('compare_level', 'case_sensitive', 'ignore_whitespaces', 'ignore_attributes', 'ignore_values',
+                 'ignore_elements')
+
+    def __init__(self):
+        self.compare_level = 3
+        self.case_sensitive = True
+        self.ignore_whitespaces = False
+        self.ignore_attributes = False
+        self.ignore_values = False
+        self.ignore_elements = []
+
+
+def setOption(options, line):
+    """ Nastavenie porovnania z riadka v tvare Názov = hodnota, neznáme nastavenia (validácia,
+    kódovanie, výstup rozdielov) a riadky bez znaku = sa ignorujú
+    """
+    line = line.split("#", 1)[0]
+    if "=" not in line:
+        return
+    name, value = (part.strip() for part in line.split("=", 1))
+    if name == "CompareLevel":
+        options.compare_level = int(value)
+    elif name == "CaseSensitive":
+        options.case_sensitive = value == "1"
+    elif name == "IgnoreWhitespaces":
+        options.ignore_whitespaces = value == "1"
+    elif name == "IgnoreAttributes":
+        options.ignore_attributes = value == "1"
+    elif name == "IgnoreValues":
+        options.ignore_values = value == "1"
+    elif name == "IgnoreElement":
+        options.ignore_elements.append(value)
+
+
+def loadOptions(path=OPTIONS_FILE):
+    """ Načítanie nastavení porovnania, chýbajúci súbor znamená predvolené nastavenia
+    """
+    options = CompareOptions()
+    if path is None or not os.path.exists(path):
+        return options
+    with open(path, encoding="utf-8", errors="replace") as stream:
+        for line in stream:
+            setOption(options, line)
+    return options
+
+
+def elementText(chunks, options):
+    """ Textový obsah elementu podľa JExamXML - spojenie textu pred potomkami a za každým potomkom
+    (tail), časti tvorené iba bielymi znakmi (odsadenie) sa nikdy neporovnávajú
+    """
+    if options.ignore_values:
+        return ""
+    text = "".join(chunk for chunk in chunks if chunk and not chunk.isspace())
+    if options.ignore_whitespaces:
+        text = " ".join(text.split())
+    return text
+
+
+def canonicalElements(source, options):
+    """
+    Prúdové načítanie dokumentu - generuje kanonický tvar každého priameho potomka koreňového
+    elementu a nakoniec kanonický tvar samotného koreňového elementu bez potomkov
+
+    Kanonický tvar je zápis elementu podobný XML so zoradenými atribútmi, s textom v úvodzovkách
+    a s kanonickými tvarmi potomkov - pri compare_level 0 v poradí z dokumentu, inak zoradenými,
+    takže rovnaké podstromy majú rovnaký tvar a obsah presunutý pod iný element sa líši.
+    """
+    ordered = options.compare_level == 0
+    path = []
+    # Časti textu každého otvoreného elementu - text za už uvoľnenými potomkami (tail)
+    texts = []
+    # Kanonické tvary uzavretých potomkov každého otvoreného elementu
+    children = []
+    # Hĺbka ignorovaného elementu, jeho podstrom sa nevracia
+    ignored = None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if path:
+                # Predchádzajúci súrodenec je uzavretý a jeho tail úplný, z rodiča sa odstráni
+                parent = path[-1]
+                if len(parent) > 1:
+                    texts[-1].append(parent[0].tail)
+                    del parent[0]
+            path.append(element)
+            texts.append([element.text])
+            children.append([])
+            if ignored is None and ">".join(item.tag for item in path) in options.ignore_elements:
+                ignored = len(path)
+            continue
+
+        depth = len(path)
+        chunks = texts.pop() + [child.tail for child in element]
+        nested = children.pop()
+        if ignored is None:
+            attributes = "" if options.ignore_attributes else "".join(
+                " %s=%r" % item for item in sorted(element.attrib.items()))
+            text = elementText(chunks, options)
+            if not ordered:
+                nested.sort()
+            # Potomkovia koreňa sa vracajú hneď, koreňový element preto už žiadne nemá
+            canonical = "<%s%s>%s%s</%s>" % (element.tag, attributes, repr(text) if text else "", "".join(nested),
+                                             element.tag)
+            if not options.case_sensitive:
+                canonical = canonical.lower()
+            if depth <= 2:
+                yield canonical
+            else:
+                children[-1].append(canonical)
+        elif depth == ignored:
+            ignored = None
+        path.pop()
+        # Element sa uvoľní okrem textu za ním (tail), ktorý patrí rodičovi
+        element.attrib.clear()
+        element.text = None
+        del element[:]
+
+
+def compare(actual, expected, options, limit=DIFFERENCE_LIMIT):
+    """
+    Porovnanie dvoch dokumentov (cesta k súboru, bajty alebo binárny prúd), vráti zoznam rozdielov,
+    prázdny zoznam znamená zhodné dokumenty. Dokument, ktorý nie je platné XML, je rozdielny.
+    Potomkovia koreňa sa pri compare_level 0 porovnávajú v poradí, inak ako multimnožiny.
+    """
+    sources = []
+    for document in (actual, expected):
+        sources.append(io.BytesIO(document) if isinstance(document, (bytes, bytearray)) else document)
+
+    differences = []
+    try:
+        if options.compare_level == 0:
+            # Porovnanie v poradí skončí pri dosiahnutí limitu rozdielov
+            pairs = itertools.zip_longest(canonicalElements(sources[0], options),
+                                          canonicalElements(sources[1], options))
+            for position, (left, right) in enumerate(pairs, 1):
+                if left != right:
+                    differences.append("%d: %s != %s" % (position, left, right))
+                    if len(differences) >= limit:
+                        break
+            return differences
+
+        remaining = collections.Counter(canonicalElements(sources[1], options))
+        extra = []
+        for element in canonicalElements(sources[0], options):
+            if remaining[element] > 0:
+                remaining[element] -= 1
+            else:
+                extra.append(element)
+    except ElementTree.ParseError as error:
+        return ["chybné XML: %s" % error]
+
+    differences.extend("navyše: %s" % element for element in extra)
+    for element, count in remaining.items():
+        differences.extend(["chýba: %s" % element] * count)
+    return differences[:limit]
+
+
+def checkFixtures(directory, path=OPTIONS_FILE):
+    """ Porovnanie dvojíc <názov>.a.xml a <názov>.b.xml z adresára s očakávanými výsledkami
+    v súbore results, vypíše dvojice s iným výsledkom a vráti XML_DIFFERENT, ak nejaká je
+    Riadok results môže za výsledkom zmeniť nastavenia porovnania (napr. CompareLevel=0)
+    """
+    failed = 0
+    with open(os.path.join(directory, "results")) as stream:
+        for line in stream:
+            line = line.split("#", 1)[0].split()
+            if not line:
+                continue
+            name, expected = line[0], int(line[1])
+            options = loadOptions(path)
+            for setting in line[2:]:
+                setOption(options, setting)
+            documents = [os.path.join(directory, "%s.%s.xml" % (name, side)) for side in "ab"]
+            result = XML_DIFFERENT if compare(documents[0], documents[1], options) else XML_EQUAL
+            if result != expected:
+                failed += 1
+                print("%s %s: %d, očakávané %d" % (name, " ".join(line[2:]), result, expected))
+    return XML_DIFFERENT if failed else XML_EQUAL
+
+
+def main(argv):
+    """ Použitie rovnaké ako pri JExamXML: xmlcompare.py A.xml B.xml [delta] [/D options]
+    Rozdiely sa zapíšu do súboru delta, ak je zadaný, inak na štandardný výstup
+    S parametrom --fixtures [adresár] sa skontrolujú dvojice dokumentov s očakávanými výsledkami
+    """
+    arguments = list(argv)
+    if arguments and arguments[0] == "--fixtures":
+        if len(arguments) > 2 or not os.path.isdir(arguments[-1] if len(arguments) == 2 else FIXTURES_DIRECTORY):
+            print("Zlé parametre!", file=sys.stderr)
+            return XML_ERROR
+        return checkFixtures(arguments[1] if len(arguments) == 2 else FIXTURES_DIRECTORY)
+
+    options_file = OPTIONS_FILE
+    if "/D" in arguments:
+        index = arguments.index("/D")
+        if index + 1 >= len(arguments):
+            print("Zlé parametre!", file=sys.stderr)
+            return XML_ERROR
+        options_file = arguments[index + 1]
+        del arguments[index:index + 2]
+    if len(arguments) not in (2, 3) or not all(os.path.exists(path) for path in arguments[:2]):
+        print("Zlé parametre!", file=sys.stderr)
+        return XML_ERROR
+
+    differences = compare(arguments[0], arguments[1], loadOptions(options_file))
+    report = "".join(difference + "\n" for difference in differences)
+    if len(arguments) == 3:
+        with open(arguments[2], "w") as stream:
+            stream.write(report)
+    else:
+        sys.stdout.write(report)
+    return XML_DIFFERENT if differences else XML_EQUAL
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))